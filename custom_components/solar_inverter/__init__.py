@@ -1,18 +1,25 @@
 from __future__ import annotations
+import asyncio
 import logging
 from datetime import timedelta
+from functools import partial
+from urllib.parse import urlsplit
 
 
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_NAME
-from homeassistant.core import HomeAssistant
+from homeassistant.components.sensor import SensorStateClass
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.discovery import async_load_platform
+from homeassistant.helpers.service import async_register_admin_service
+from homeassistant.util import dt as dt_util
 
 
 from .const import (
@@ -21,50 +28,338 @@ from .const import (
     CONF_DEVICE,
     CONF_SCAN_INTERVAL,
     CONF_QUERIES,
+    CONF_INVERTERS,
+    CONF_MAX_CONCURRENT,
+    CONF_QUERY,
+    CONF_INTERVAL,
+    CONF_PRIORITY,
+    CONF_HEARTBEAT,
+    CONF_STREAMING,
+    CONF_STREAM_BUFFER,
+    CONF_ENERGY,
+    CONF_PARALLEL,
+    CONF_HISTORY,
+    CONF_HISTORY_DAYS,
+    CONF_COUNTERS,
+    CONF_STATISTICS,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_MAX_CONCURRENT,
+    DEFAULT_HEARTBEAT,
+    DEFAULT_STREAM_BUFFER,
+    DEFAULT_HISTORY_DAYS,
+    DEFAULT_STATIC_TTL,
+    STREAM_QUERY,
+    ENERGY_QUERY,
+    STATISTICS_QUERY,
+    DATA_SCHEDULER,
+    STATIC_QUERIES,
+    COUNTER_QUERIES,
+    SERVICE_REFRESH_SETTINGS,
+    SERVICE_SEND_COMMAND,
+    SERVICE_HISTORY,
+    SERVICE_PROFILE,
+    CONF_COMMAND,
+    EVENT_COMMAND,
+    STARTUP_DEADLINE,
     SUPPORTED_QUERIES,
+    DEFAULT_QUERIES,
 )
 from .hub import InverterHub
-from .queries import get_user_queries
+from .scheduler import PollScheduler, QuerySchedule, ScheduledQuery
+from .stream import MetricStream
+from .energy import EnergyAccumulator
+from .static import StaticCache
+from .history import HistoryStore
+from .counters import EnergyCounters
+from .statistics import HourlyStatistics
+from .parallel import ParallelGroup
+from .queries import QUERIES, get_user_queries, query_name
 
 
 _LOGGER = logging.getLogger(__name__)
 
+
+def _device(value) -> str:
+    """A hidraw path, fake, replay:<capture> or tcp://host:port with both parts."""
+    value = cv.string(value)
+    url = urlsplit(value)
+    if url.scheme == "tcp":
+        try:
+            port = url.port
+        except ValueError as e:
+            raise vol.Invalid(f"{value}: invalid port") from e
+        if not url.hostname or port is None:
+            raise vol.Invalid(f"{value}: expected tcp://host:port")
+    return value
+
+
+# a query is either its bare name (polled every scan_interval) or a tier
+QUERY_SCHEMA = vol.Any(
+    vol.In(SUPPORTED_QUERIES),
+    vol.Schema(
+        {
+            vol.Required(CONF_QUERY): vol.In(SUPPORTED_QUERIES),
+            vol.Optional(CONF_INTERVAL): cv.positive_float,
+            vol.Optional(CONF_PRIORITY, default=0): int,
+        }
+    ),
+)
+
+INVERTER_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_DEVICE): _device,
+        vol.Optional(
+            CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL
+        ): cv.positive_int,
+        vol.Optional(
+            CONF_QUERIES, default=DEFAULT_QUERIES
+        ): vol.All(cv.ensure_list, [QUERY_SCHEMA]),
+        vol.Optional(CONF_NAME, default="Inverter"): cv.string,
+        # unchanged values are still re-published this often (seconds)
+        vol.Optional(
+            CONF_HEARTBEAT, default=DEFAULT_HEARTBEAT
+        ): cv.positive_int,
+        # sample QPIGS back to back, publish min/mean/max every scan_interval
+        vol.Optional(CONF_STREAMING, default=False): cv.boolean,
+        vol.Optional(
+            CONF_STREAM_BUFFER, default=DEFAULT_STREAM_BUFFER
+        ): cv.positive_int,
+        # kWh counters integrated from QPIGS power at the poll/stream rate
+        vol.Optional(CONF_ENERGY, default=True): cv.boolean,
+        # units of a parallel system behind this device, read with QPGS0..n-1
+        vol.Optional(CONF_PARALLEL, default=0): vol.All(int, vol.Range(min=0, max=9)),
+        # every poll's numeric values into a compact per-day file store
+        vol.Optional(CONF_HISTORY, default=False): cv.boolean,
+        vol.Optional(
+            CONF_HISTORY_DAYS, default=DEFAULT_HISTORY_DAYS
+        ): cv.positive_int,
+        # the device's own daily/monthly/yearly PV counters (PI30 MAX), past periods cached
+        vol.Optional(CONF_COUNTERS, default=False): cv.boolean,
+        # hourly QPIGS statistics imported by the hub instead of recorded states
+        vol.Optional(CONF_STATISTICS, default=False): cv.boolean,
+    }
+)
+
+def _unique_names(inverters: list) -> list:
+    """Services and statistic ids pick an inverter by name, two must not share one."""
+    seen = set()
+    for i, conf in enumerate(inverters):
+        name = conf[CONF_NAME]
+        if name in seen:
+            # pointing at the entry, the error is reported over the single-inverter one
+            raise vol.Invalid(f"inverter name {name!r} is used more than once", path=[i, CONF_NAME])
+        seen.add(name)
+    return inverters
+
+
+# several inverters on one host, each on its own bus; an optional cap on
+# concurrent polls, all of them at once when not set
+FLEET_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_INVERTERS): vol.All(cv.ensure_list, [INVERTER_SCHEMA], _unique_names),
+        vol.Optional(CONF_MAX_CONCURRENT): cv.positive_int,
+    }
+)
+
+REFRESH_SETTINGS_SCHEMA = vol.Schema(
+    {
+        # inverter name, all of them when left out
+        vol.Optional(CONF_NAME): cv.string,
+    }
+)
+
+SEND_COMMAND_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_COMMAND): vol.All(cv.string, vol.Upper, vol.Match(r"^[A-Z0-9.]+$")),
+        vol.Optional(CONF_NAME): cv.string,
+    }
+)
+
+HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_NAME): cv.string,
+        vol.Required("start"): cv.datetime,
+        vol.Optional("end"): cv.datetime,
+        vol.Optional("keys"): vol.All(cv.ensure_list, [cv.string]),
+        # bucket size in seconds, every sample when left out
+        vol.Optional("step"): cv.positive_float,
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_NAME): cv.string,
+        vol.Optional("cycles", default=10): vol.All(int, vol.Range(min=1, max=1000)),
+        vol.Optional("memory", default=False): cv.boolean,
+    }
+)
+
 CONFIG_SCHEMA = vol.Schema(
     {
-        DOMAIN: vol.Schema(
-            {
-                vol.Required(CONF_DEVICE): cv.string,
-                vol.Optional(
-                    CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL
-                ): cv.positive_int,
-                vol.Optional(
-                    CONF_QUERIES, default=list(sorted(SUPPORTED_QUERIES))
-                ): vol.All(cv.ensure_list, [vol.In(SUPPORTED_QUERIES)]),
-                vol.Optional(CONF_NAME, default="Inverter"): cv.string,
-            }
-        )
+        DOMAIN: vol.Any(INVERTER_SCHEMA, FLEET_SCHEMA)
     },
     extra=vol.ALLOW_EXTRA,
 )
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
-    """Import YAML into a ConfigEntry (one entry only)."""
+    """Import YAML into ConfigEntries, one per inverter."""
     conf = config.get(DOMAIN)
     if not conf:
         return True
-    # Create/update config entry from YAML
-    hass.async_create_task(
-        hass.config_entries.flow.async_init(
-            DOMAIN,
-            context={"source": config_entries.SOURCE_IMPORT},
-            data=conf,
-        )
+
+    if CONF_INVERTERS in conf:
+        inverters = conf[CONF_INVERTERS]
+        max_concurrent = conf.get(CONF_MAX_CONCURRENT, len(inverters))
+    else:
+        inverters = [conf]
+        max_concurrent = 1
+
+    hass.data[DATA_SCHEDULER] = PollScheduler(max_concurrent)
+
+    async def refresh_settings(call: ServiceCall):
+        name = call.data.get(CONF_NAME)
+        for data in hass.data.get(DOMAIN, {}).values():
+            if name is None or data["name"] == name:
+                data["hub"].refresh_static()
+                await data["coordinator"].async_request_refresh()
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_REFRESH_SETTINGS, refresh_settings, schema=REFRESH_SETTINGS_SCHEMA
     )
+
+    async def send_command(call: ServiceCall):
+        # known queries come back parsed, anything else (setters) as the raw answer
+        cmd = call.data[CONF_COMMAND]
+        name = call.data.get(CONF_NAME)
+        query = QUERIES.get(cmd)
+
+        sent = False
+        for data in list(hass.data.get(DOMAIN, {}).values()):
+            if name is not None and data["name"] != name:
+                continue
+
+            hub: InverterHub = data["hub"]
+            try:
+                if query is not None:
+                    result = await hub.async_read(query)
+                else:
+                    result = await hub.async_command(cmd)
+            except Exception as e:
+                raise HomeAssistantError(f"{data['name']}: {cmd} failed: {e}") from e
+
+            sent = True
+            # admin services have no response, the answer goes out as an event
+            hass.bus.async_fire(EVENT_COMMAND, {
+                "inverter": data["name"],
+                "command": cmd,
+                "result": result,
+            }, context=call.context)
+
+        if not sent:
+            raise HomeAssistantError(f"No inverter named {name}")
+
+    # setters change the inverter state, admins only
+    async_register_admin_service(
+        hass, DOMAIN, SERVICE_SEND_COMMAND, send_command, schema=SEND_COMMAND_SCHEMA
+    )
+
+    async def history(call: ServiceCall) -> ServiceResponse:
+        name = call.data[CONF_NAME]
+        data = next((d for d in hass.data.get(DOMAIN, {}).values() if d["name"] == name), None)
+        if data is None or data["hub"].history is None:
+            raise HomeAssistantError(f"No history kept for {name}")
+
+        start = dt_util.as_timestamp(call.data["start"])
+        end = dt_util.as_timestamp(call.data.get("end") or dt_util.now())
+        return await data["hub"].async_history(start, end, call.data.get("keys"), call.data.get("step"))
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_HISTORY, history, schema=HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def profile(call: ServiceCall) -> ServiceResponse:
+        name = call.data[CONF_NAME]
+        data = next((d for d in hass.data.get(DOMAIN, {}).values() if d["name"] == name), None)
+        if data is None:
+            raise HomeAssistantError(f"No inverter named {name}")
+
+        hub: InverterHub = data["hub"]
+        try:
+            profiled = hub.start_profile(call.data["cycles"], call.data["memory"])
+        except RuntimeError as e:
+            raise HomeAssistantError(str(e)) from e
+
+        async def report() -> dict:
+            try:
+                profiler = await profiled
+            except RuntimeError as e:
+                raise HomeAssistantError(str(e)) from e
+            return await hass.async_add_executor_job(profiler.report, hass.config.path(DOMAIN, "profiles"))
+
+        if call.return_response:
+            return await report()
+
+        async def log_summary():
+            try:
+                _LOGGER.info("%s profile: %s", name, await report())
+            except HomeAssistantError as e:
+                _LOGGER.warning("%s profile: %s", name, e)
+
+        hass.async_create_background_task(log_summary(), f"{DOMAIN} {name} profile")
+        return None
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, profile, schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    # Create/update config entries from YAML
+    for inverter in inverters:
+        hass.async_create_task(
+            hass.config_entries.flow.async_init(
+                DOMAIN,
+                context={"source": config_entries.SOURCE_IMPORT},
+                data=inverter,
+            )
+        )
     return True
 
 
+def _build_schedule(user_queries, scan_seconds, skip=()) -> QuerySchedule:
+    entries = []
+    for user_q in user_queries:
+        query = QUERIES.get(query_name(user_q))
+        if query is None or query.cmd() in skip:
+            continue
+
+        opts = user_q if isinstance(user_q, dict) else {}
+        entries.append(
+            ScheduledQuery(
+                query,
+                opts.get(CONF_INTERVAL, scan_seconds),
+                opts.get(CONF_PRIORITY, 0),
+            )
+        )
+
+    return QuerySchedule(entries)
+
+
+def _build_static(user_queries) -> StaticCache | None:
+    # the interval of a settings query is how long its cached answer is trusted
+    ttls = {}
+    for user_q in user_queries:
+        name = query_name(user_q)
+        if name not in STATIC_QUERIES or name not in QUERIES:
+            continue
+
+        opts = user_q if isinstance(user_q, dict) else {}
+        ttls[QUERIES[name]] = opts.get(CONF_INTERVAL, DEFAULT_STATIC_TTL)
+
+    return StaticCache(ttls) if ttls else None
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     device: str = entry.data[CONF_DEVICE]
     scan_seconds = entry.data[CONF_SCAN_INTERVAL]
@@ -80,20 +375,83 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     )
 
     selected_queries = get_user_queries(user_queries)
-  
-    hub = InverterHub(hass, device, name=name, queries=selected_queries)
+
+    stream = None
+    if entry.data.get(CONF_STREAMING) and QUERIES[STREAM_QUERY] in selected_queries:
+        stream = MetricStream(
+            QUERIES[STREAM_QUERY],
+            entry.data.get(CONF_STREAM_BUFFER, DEFAULT_STREAM_BUFFER),
+        )
+
+    energy = None
+    if entry.data.get(CONF_ENERGY, True) and QUERIES[ENERGY_QUERY] in selected_queries:
+        energy = EnergyAccumulator(QUERIES[ENERGY_QUERY])
+
+    static = _build_static(user_queries)
+
+    statistics = None
+    if entry.data.get(CONF_STATISTICS) and QUERIES[STATISTICS_QUERY] in selected_queries:
+        statistics = HourlyStatistics(
+            [m for m in QUERIES[STATISTICS_QUERY].metrics() if m.sc == SensorStateClass.MEASUREMENT],
+            energy.metrics() if energy else (),
+        )
+
+    counters = None
+    if entry.data.get(CONF_COUNTERS):
+        # the hub reads them on its own pace, not as scheduled queries
+        counters = EnergyCounters()
+        selected_queries = [q for q in selected_queries if q.cmd() not in COUNTER_QUERIES]
+
+    group = None
+    if entry.data.get(CONF_PARALLEL):
+        group = ParallelGroup(entry.data[CONF_PARALLEL])
+
+    history = None
+    if entry.data.get(CONF_HISTORY):
+        # numbers only, enum states and bitmasks carry options
+        metrics = [m for q in selected_queries for m in q.metrics()]
+        metrics += stream.metrics() if stream else ()
+        metrics += energy.metrics() if energy else ()
+        metrics += group.metrics() if group else ()
+        metrics += counters.metrics() if counters else ()
+        history = HistoryStore(
+            hass.config.path(DOMAIN, "history", entry.entry_id),
+            [m.uuid for m in metrics if m.options is None],
+            entry.data.get(CONF_HISTORY_DAYS, DEFAULT_HISTORY_DAYS),
+        )
+
+    skip = STATIC_QUERIES + ((STREAM_QUERY,) if stream else ()) + (COUNTER_QUERIES if counters else ())
+    schedule = _build_schedule(user_queries, scan_seconds, skip=skip)
+    # tick as often as the fastest query tier needs, streamed data is published every scan_interval
+    interval = min(schedule.tick or scan_seconds, scan_seconds) if stream else (schedule.tick or scan_seconds)
+
+    hub = InverterHub(
+        hass, device, name=name, queries=selected_queries, schedule=schedule,
+        heartbeat=entry.data.get(CONF_HEARTBEAT, DEFAULT_HEARTBEAT),
+        interval=interval, stream=stream, energy=energy, entry_id=entry.entry_id,
+        static=static, history=history, group=group, counters=counters,
+        statistics=statistics,
+    )
     await hub.async_init()
 
+    scheduler = hass.data.setdefault(
+        DATA_SCHEDULER,
+        PollScheduler(max(DEFAULT_MAX_CONCURRENT, len(hass.config_entries.async_entries(DOMAIN)))),
+    )
+
     coordinator = DataUpdateCoordinator(
         hass,
         _LOGGER,
-        name=f"{DOMAIN}_coordinator",
-        update_method=hub.async_poll_all,
-        update_interval=timedelta(seconds=scan_seconds),
+        name=f"{DOMAIN}_coordinator_{name}",
+        update_method=partial(scheduler.async_poll, hub),
+        update_interval=timedelta(seconds=interval),
     )
+    if hub.restored:
+        # entities come up with what they showed before the restart, marked stale
+        coordinator.async_set_updated_data(hub.restored)
 
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN] = {
+    hass.data[DOMAIN][entry.entry_id] = {
         "hub": hub,
         "coordinator": coordinator,
         "name": name,
@@ -102,10 +460,28 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # HA startup does not wait for the inverter
+    entry.async_create_background_task(
+        hass, _async_first_refresh(name, coordinator), f"{DOMAIN} {name} first poll"
+    )
+
     return True
 
 
+async def _async_first_refresh(name: str, coordinator: DataUpdateCoordinator):
+    try:
+        async with asyncio.timeout(STARTUP_DEADLINE):
+            await coordinator.async_refresh()
+    except TimeoutError:
+        _LOGGER.warning(
+            "%s: no answer within %ss of startup, keep polling on schedule", name, STARTUP_DEADLINE
+        )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
+    if not await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        return False
+
     data = hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
     if data:
         hub: InverterHub = data["hub"]
@@ -0,0 +1,72 @@
+from __future__ import annotations
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from .const import DOMAIN, CONF_QUERIES
+from .queries.pi30 import QPIWS, WARNINGS
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, add: AddEntitiesCallback
+) -> None:
+    data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = data["coordinator"]
+    hub = data["hub"]
+
+    if QPIWS not in data[CONF_QUERIES]:
+        return
+
+    key = QPIWS.metrics()[0].uuid
+    add(
+        HidInverterWarningSensor(coordinator, hub, entry.entry_id, key, bit, warning, name)
+        for bit, (warning, name) in enumerate(WARNINGS.items())
+        if not warning.startswith("reserved")
+    )
+
+
+class HidInverterWarningSensor(CoordinatorEntity, BinarySensorEntity):
+    """One QPIWS bit. Writes its state only when the hub saw that bit flip."""
+
+    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+
+    def __init__(self, coordinator, hub, entry_id : str, key: str, bit: int, warning: str, name: str):
+        super().__init__(coordinator)
+
+        self._hub = hub
+        self._key = key
+        self._bit = 1 << bit
+        self._was_available = None
+
+        self._attr_unique_id = f"{entry_id}-warning-{warning}"
+        self._attr_name = f"Warning {name}"
+
+    @property
+    def available(self) -> bool:
+        return super().available and bool(self.coordinator.data)
+
+    @property
+    def extra_state_attributes(self):
+        if self._hub.stale_since is not None:
+            return {"stale": True}
+        return None
+
+    @property
+    def is_on(self) -> bool | None:
+        mask = (self.coordinator.data or {}).get(self._key)
+        if mask is None:
+            return None
+        return bool(mask & self._bit)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        available = self.available
+        if available == self._was_available and not self._hub.warnings_flipped & self._bit:
+            return
+
+        self._was_available = available
+        self.async_write_ha_state()
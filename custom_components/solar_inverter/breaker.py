@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import logging
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Per-device health: closed -> open -> half-open -> closed.
+
+    After `threshold` consecutive unreachable errors the circuit opens and
+    polls are refused until the backoff expires. Then a single probe is let
+    through (half-open); success closes the circuit, failure reopens it with
+    the backoff doubled.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, threshold: int = 2,
+                 base_backoff: float = 5.0, max_backoff: float = 300.0):
+        self._name = name
+        self._threshold = threshold
+        self._base_backoff = base_backoff
+        self._max_backoff = max_backoff
+
+        self._state = CircuitBreaker.CLOSED
+        self._failures = 0
+        self._backoff = base_backoff
+        self._retry_at = 0.0
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @property
+    def retry_at(self) -> float:
+        return self._retry_at
+
+    def allow(self, now: float) -> bool:
+        if self._state == CircuitBreaker.OPEN:
+            if now < self._retry_at:
+                return False
+            self._state = CircuitBreaker.HALF_OPEN
+            _LOGGER.debug("%s: probing device", self._name)
+
+        return True
+
+    def success(self):
+        if self._state != CircuitBreaker.CLOSED:
+            _LOGGER.info("%s: device is back", self._name)
+
+        self._state = CircuitBreaker.CLOSED
+        self._failures = 0
+        self._backoff = self._base_backoff
+
+    def failure(self, now: float):
+        self._failures += 1
+
+        if self._state == CircuitBreaker.HALF_OPEN:
+            self._backoff = min(self._backoff * 2, self._max_backoff)
+            self._open(now)
+        elif self._state == CircuitBreaker.CLOSED and self._failures >= self._threshold:
+            self._open(now)
+            _LOGGER.warning(
+                "%s: device unreachable, pausing polls (retry in %.0fs)",
+                self._name, self._backoff,
+            )
+
+    def _open(self, now: float):
+        self._state = CircuitBreaker.OPEN
+        self._retry_at = now + self._backoff
@@ -0,0 +1,60 @@
+"""Append-only capture log of device exchanges.
+
+Layout: an 8 byte magic, then records of
+    <t_start: f64> <t_end: f64> <cmd_len: u8> <frame_len: u16> <cmd> <frame>
+little endian. Like codec.py this has no Home Assistant imports, the recorder
+in test/ writes it and devices/replay.py plays it back.
+"""
+import os
+import struct
+
+
+MAGIC = b"PI30CAP1"
+
+_HEADER = struct.Struct("<ddBH")
+
+
+class CaptureWriter:
+    def __init__(self, path: str):
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._f = open(path, "ab", buffering=0)
+        if new:
+            self._f.write(MAGIC)
+
+    def write(self, cmd: str, frame: bytes, t_start: float, t_end: float):
+        c = cmd.encode("ascii")
+        # one write per record, a crash never leaves half a header behind a good record
+        self._f.write(_HEADER.pack(t_start, t_end, len(c), len(frame)) + c + frame)
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_capture(path: str):
+    """Yield (cmd, frame, t_start, t_end); a truncated tail record is ignored."""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a capture log")
+
+    view = memoryview(data)
+    pos = len(MAGIC)
+    end = len(data)
+    size = _HEADER.size
+    while pos + size <= end:
+        t_start, t_end, clen, flen = _HEADER.unpack_from(view, pos)
+        pos += size
+        if pos + clen + flen > end:
+            break
+        cmd = bytes(view[pos:pos + clen]).decode("ascii")
+        pos += clen
+        frame = bytes(view[pos:pos + flen])
+        pos += flen
+        yield cmd, frame, t_start, t_end
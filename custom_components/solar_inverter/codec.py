@@ -0,0 +1,58 @@
+"""PI30 frame codec shared by the integration and the tools in test/.
+
+Kept free of Home Assistant imports so the test scripts can load it directly.
+"""
+from binascii import crc_hqx
+
+
+_FORBIDDEN_BYTES = ( 0x0A, 0x0D, 0x28 )
+
+# commands without arguments, their frames never change
+STATIC_COMMANDS = ( "QPIGS", "QPIGS2", "QPIRI", "QPIWS", "QMOD", "QDI", "QFLAG", "QET" )
+
+
+class CrcMismatch(Exception):
+    pass
+
+
+def calc_crc(data) -> int:
+    # CRC-16/XMODEM, crc_hqx walks the data in C with a byte-wise table
+    crc = crc_hqx(data, 0)
+
+    if (crc & 0xFF) in _FORBIDDEN_BYTES:
+        crc = crc + 0x01
+    if (crc >> 8) in _FORBIDDEN_BYTES:
+        crc = crc + 0x100
+
+    return crc
+
+
+def build_frame(cmd: str) -> bytes:
+    payload = bytearray(cmd.encode('utf-8'))
+    crc = calc_crc(payload)
+    payload.append((crc >> 8) & 0xFF)
+    payload.append(crc & 0xFF)
+    payload.append(0x0D)
+
+    return bytes(payload)
+
+
+_FRAMES = { cmd: build_frame(cmd) for cmd in STATIC_COMMANDS }
+
+
+def encode(cmd: str) -> bytes:
+    frame = _FRAMES.get(cmd)
+    if frame is None:
+        # commands with arguments (setters) are built on demand
+        frame = build_frame(cmd)
+
+    return frame
+
+
+def check_crc(frame) -> bool:
+    """Validate '<payload><crc_hi><crc_lo>\\r' without copying the payload."""
+    if len(frame) < 4:
+        return False
+
+    view = memoryview(frame)
+    return calc_crc(view[:-3]) == (view[-3] << 8) | view[-2]
@@ -1,7 +1,51 @@
 DOMAIN = "solar_inverter"
-PLATFORMS = ["sensor"]
+PLATFORMS = ["sensor", "binary_sensor"]
 CONF_DEVICE = "device"
 CONF_SCAN_INTERVAL = "scan_interval"
 CONF_QUERIES = "queries"
+CONF_INVERTERS = "inverters"
+CONF_MAX_CONCURRENT = "max_concurrent_polls"
+CONF_QUERY = "query"
+CONF_INTERVAL = "interval"
+CONF_PRIORITY = "priority"
+CONF_HEARTBEAT = "heartbeat"
+CONF_STREAMING = "streaming"
+CONF_STREAM_BUFFER = "stream_buffer"
+CONF_ENERGY = "energy"
+CONF_PARALLEL = "parallel_units"
+CONF_HISTORY = "history"
+CONF_HISTORY_DAYS = "history_days"
+CONF_COUNTERS = "energy_counters"
+CONF_STATISTICS = "statistics"
 DEFAULT_SCAN_INTERVAL = 5
-SUPPORTED_QUERIES = {"QPIGS", "QPIRI", "QPIWS", "QMOD"}
\ No newline at end of file
+# floor of the poll cap when it is not sized from the configured inverters
+DEFAULT_MAX_CONCURRENT = 4
+DEFAULT_HEARTBEAT = 300
+DEFAULT_STREAM_BUFFER = 600
+DEFAULT_STATIC_TTL = 86400
+DEFAULT_HISTORY_DAYS = 90
+# seconds the first poll after start may take before the regular schedule takes over
+STARTUP_DEADLINE = 30
+STREAM_QUERY = "QPIGS"
+ENERGY_QUERY = "QPIGS"
+STATISTICS_QUERY = "QPIGS"
+# settings, read at start, after a mode change, on the service call or
+# when their interval (default DEFAULT_STATIC_TTL) runs out
+STATIC_QUERIES = ("QPIRI", "QDI", "QFLAG")
+# the device's PV energy counters, read by the hub itself with CONF_COUNTERS
+COUNTER_QUERIES = ("QET", "QEY", "QEM", "QED")
+SERVICE_REFRESH_SETTINGS = "refresh_settings"
+SERVICE_SEND_COMMAND = "send_command"
+SERVICE_HISTORY = "history"
+SERVICE_PROFILE = "profile"
+CONF_COMMAND = "command"
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+# fired when a QPIWS warning bit turns on or off
+EVENT_WARNING = f"{DOMAIN}_warning"
+# fired with the answer of each send_command
+EVENT_COMMAND = f"{DOMAIN}_command"
+SUPPORTED_QUERIES = {
+    "QPIGS", "QPIGS2", "QPIRI", "QPIWS", "QMOD", "QDI", "QFLAG",
+    "QET", "QEY", "QEM", "QED",
+}
+DEFAULT_QUERIES = ["QMOD", "QPIGS", "QPIRI", "QPIWS"]
\ No newline at end of file
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.const import UnitOfEnergy
+
+from .queries.metric import Metric
+from .queries.pi30 import QET, QEY, QEM, QED
+
+
+# closed periods -> (query, key format)
+_PERIODS = {
+    "days": (QED, "%Y%m%d"),
+    "months": (QEM, "%Y%m"),
+    "years": (QEY, "%Y"),
+}
+
+_METRICS = (
+    Metric(-1, "pv_generated_yesterday", "PV Generated Yesterday", SensorDeviceClass.ENERGY, UnitOfEnergy.KILO_WATT_HOUR, None),
+    Metric(-1, "pv_generated_last_month", "PV Generated Last Month", SensorDeviceClass.ENERGY, UnitOfEnergy.KILO_WATT_HOUR, None),
+    Metric(-1, "pv_generated_last_year", "PV Generated Last Year", SensorDeviceClass.ENERGY, UnitOfEnergy.KILO_WATT_HOUR, None),
+)
+
+
+def _value(query, parsed: dict):
+    return parsed.get(query.metrics()[0].uuid)
+
+
+def _month_back(today: date, n: int) -> date:
+    m = today.year * 12 + today.month - 1 - n
+    return date(m // 12, m % 12 + 1, 1)
+
+
+class EnergyCounters:
+    """The device's own PV energy counters (QET/QEY/QEM/QED, PI30 MAX).
+
+    The hub reads the running total and the current day, month and year
+    every few minutes. A closed period never changes again: once read it is
+    cached for good, and only periods missing from the cache are asked for,
+    most recent first, one per cycle between the live polls. A period the
+    device has no value for is cached as None and not asked for again.
+    """
+
+    def __init__(self, days: int = 31, months: int = 12, years: int = 3):
+        self._depth = {"days": days, "months": months, "years": years}
+        self._closed = {period: {} for period in _PERIODS}
+
+    @property
+    def live(self) -> tuple:
+        return (QET, QEY, QEM, QED)
+
+    def metrics(self) -> tuple[Metric, ...]:
+        return tuple(m for q in self.live for m in q.metrics()) + _METRICS
+
+    def missing(self, today: date):
+        """Next closed period not in the cache: (query, its date, period, key), or None."""
+        for period, (query, fmt) in _PERIODS.items():
+            cache = self._closed[period]
+            for n in range(1, self._depth[period] + 1):
+                if period == "days":
+                    when = today - timedelta(days=n)
+                elif period == "months":
+                    when = _month_back(today, n)
+                else:
+                    when = date(today.year - n, 1, 1)
+
+                key = when.strftime(fmt)
+                if key not in cache:
+                    return query, when, period, key
+        return None
+
+    def store(self, period: str, key: str, parsed: dict):
+        """Cache an answer; a NAK ({}) or an empty one marks the period unavailable."""
+        query = _PERIODS[period][0]
+        self._closed[period][key] = _value(query, parsed)
+
+    def values(self, today: date) -> dict:
+        yesterday = today - timedelta(days=1)
+        return {
+            "pv_generated_yesterday": self._closed["days"].get(yesterday.strftime("%Y%m%d")),
+            "pv_generated_last_month": self._closed["months"].get(_month_back(today, 1).strftime("%Y%m")),
+            "pv_generated_last_year": self._closed["years"].get(str(today.year - 1)),
+        }
+
+    def as_dict(self) -> dict:
+        return {period: dict(cache) for period, cache in self._closed.items()}
+
+    def restore(self, data: dict | None):
+        for period, cache in (data or {}).items():
+            if period in self._closed:
+                self._closed[period] = {k: (None if v is None else float(v)) for k, v in cache.items()}
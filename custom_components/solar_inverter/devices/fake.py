@@ -1,16 +1,46 @@
+import asyncio
+import random
+
+
 class FakeDevice:
-    def __init__(self):
+    _STUBS = {
+        "QPIGS" : b"(218.6 49.9 230.0 49.9 0368 0265 007 396 53.10 013 021 0046 0013 226.4 00.00 00000 00010010 00 00 01049 010xx\r",
+        "QPIRI" : b"(230.0 21.7 230.0 50.0 21.7 5000 5000 48.0 51.0 50.8 58.4 54.8 2 030 090 0 2 1 9 01 0 0 52.0 0 1 000xx\r",
+        "QPIWS" : b"(00000000000010000000000000000000xx\r",
+        "QMOD"  : b"(Bxx\r",
+        "QPIGS2": b"(03.1 327.3 01026xx\r",
+        "QDI"   : b"(230.0 50.0 0030 44.0 54.0 56.4 46.0 60 0 0 2 0 0 0 0 0 1 1 1 0 1 0 54.0 0 1 224 0xx\r",
+        "QFLAG" : b"(EakxyzDbjuvxx\r",
+        "QET"   : b"(00238800xx\r",
+        # parallel units, phase 1 and 2 of a 3 phase system
+        "QPGS0" : b"(1 92932004102453 L 00 230.1 50.01 230.1 50.01 0690 0621 013 53.1 010 100 245.3 020 01380 01242 013 10100110 2 1 060 120 030 04 000xx\r",
+        "QPGS1" : b"(1 92932004102454 L 00 229.8 50.01 229.9 50.01 0720 0655 014 53.1 012 100 247.1 020 01380 01242 013 10100110 3 1 060 120 030 05 000xx\r",
+        # dated counters, QEYyyyy, QEMyyyymm, QEDyyyymmdd
+        "QEY"   : b"(00102400xx\r",
+        "QEM"   : b"(00012800xx\r",
+        "QED"   : b"(00001200xx\r",
+    }
+
+    _NAK = b"(NAKxx\r"
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0):
+        # simulated turnaround per command, latency + uniform(0, jitter) seconds
+        self._latency = latency
+        self._jitter = jitter
+
+    def close(self):
         pass
 
-    async def query(self, cmd: str) -> bytes:
-        stubs = {
-            "QPIGS" : "(218.6 49.9 230.0 49.9 0368 0265 007 396 53.10 013 021 0046 0013 226.4 00.00 00000 00010010 00 00 01049 010xx\r",
-            "QPIRI" : "(230.0 21.7 230.0 50.0 21.7 5000 5000 48.0 51.0 50.8 58.4 54.8 2 030 090 0 2 1 9 01 0 0 52.0 0 1 000xx\r",
-            "QPIWS" : "(00000000000010000000000000000000xx\r",
-            "QMOD"  : "(Bxx\r"
-        }
-
-        if cmd not in stubs:
-            return "(NAK\r".encode()
-        
-        return stubs[cmd].encode()
\ No newline at end of file
+    async def query(self, cmd: str, timeout: float | None = None) -> bytes:
+        if self._latency or self._jitter:
+            delay = self._latency + random.uniform(0, self._jitter)
+            if timeout is not None and delay > timeout:
+                await asyncio.sleep(timeout)
+                raise asyncio.TimeoutError("overall timeout")
+            await asyncio.sleep(delay)
+
+        stub = FakeDevice._STUBS.get(cmd)
+        if stub is None and cmd[:3] in ("QEY", "QEM", "QED"):
+            stub = FakeDevice._STUBS[cmd[:3]]
+
+        return stub or FakeDevice._NAK
@@ -1,23 +1,29 @@
 import os
 import fcntl
-import select
 import asyncio
 
 import logging
 
+from .. import codec
+
 _LOGGER = logging.getLogger(__name__)
 
 
 class HidrawInverter():
-    _TA = [
-        0x0000,0x1021,0x2042,0x3063,0x4084,0x50a5,0x60c6,0x70e7,
-        0x8108,0x9129,0xa14a,0xb16b,0xc18c,0xd1ad,0xe1ce,0xf1ef
-    ]
-
-    _FORBIDDEN_BYTES = [ 0x0A, 0x0D, 0x28 ]
+    _MAX_BYTES = 4096
 
     def __init__(self, device_path):
         self._device_path = device_path
+        self._fd = None
+
+        # receive buffer is allocated once and reused for every frame
+        self._rxbuf = bytearray(HidrawInverter._MAX_BYTES)
+        self._rxview = memoryview(self._rxbuf)
+        self._rxlen = 0
+        self._waiter = None
+
+        # set when a read gave up mid-frame, late bytes must be dropped
+        self._stale = False
 
     @staticmethod
     def _open(path):
@@ -27,104 +33,135 @@ class HidrawInverter():
         fcntl.fcntl(fd, fcntl.F_SETFD, flags | fcntl.FD_CLOEXEC)
 
         return fd
-   
+
     @staticmethod
     def _close(fd):
         os.close(fd)
 
-    async def query(self, cmd: str) -> bytes:
-        fd = None
+    def _ensure_open(self):
+        if self._fd is None:
+            self._fd = self._open(self._device_path)
+            self._stale = False
+            _LOGGER.debug("Opened %s", self._device_path)
 
-        try:
-            fd = self._open(self._device_path)
-        
-            encoded = HidrawInverter._encode(cmd)
+        return self._fd
+
+    def close(self):
+        if self._fd is not None:
+            fd, self._fd = self._fd, None
+            try:
+                self._close(fd)
+            except OSError:
+                pass
+
+    def _drain(self, fd):
+        """Drop whatever is left from a previous timed out exchange."""
+        dropped = 0
+        while True:
+            try:
+                data = os.read(fd, HidrawInverter._MAX_BYTES)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            dropped += len(data)
+
+        self._stale = False
+        if dropped:
+            _LOGGER.debug("Drained %d stale bytes from %s", dropped, self._device_path)
 
+    def _write(self, cmd: str):
+        encoded = codec.encode(cmd)
+
+        try:
+            fd = self._ensure_open()
+            if self._stale:
+                self._drain(fd)
+            os.write(fd, encoded)
+        except OSError:
+            # device was unplugged/replugged since the last query, retry once on a fresh fd
+            self.close()
+            fd = self._ensure_open()
             os.write(fd, encoded)
 
-            resp = await self._read(fd)
+        return fd
 
-            expected_crc = self._calc_crc(resp[0:-3])
-            real_crc = (resp[-3] << 8) + resp[-2]
+    async def query(self, cmd: str, timeout: float = 2.0) -> bytes:
+        try:
+            fd = self._write(cmd)
+
+            resp = await self._read(fd, overall=timeout)
 
-            if expected_crc != real_crc:
-                raise Exception("CRC missmatch")
+            if not codec.check_crc(resp):
+                raise codec.CrcMismatch("CRC missmatch")
 
             return resp
 
+        except asyncio.TimeoutError as e:
+            self._stale = True
+            _LOGGER.debug(f"Error reading {cmd} from the {self._device_path}: {e}")
+            raise e
+        except OSError as e:
+            self.close()
+            _LOGGER.debug(f"Error reading {cmd} from the {self._device_path}: {e}")
+            raise e
         except Exception as e:
-            _LOGGER.error(f"Error reading {cmd} from the {self._device_path}: {e}")
+            _LOGGER.debug(f"Error reading {cmd} from the {self._device_path}: {e}")
             raise e
-        finally:
-            if fd:
-                self._close(fd)
 
-        return bytes()
-    
-    @staticmethod
-    async def _read(fd, overall=2.0, interbyte=0.5, chunk=128, max_bytes=4096) -> bytes:
-        rxbuf = bytearray()
-        deadline = asyncio.get_running_loop().time() + overall
-        while True:
-            # already have a frame?
-            try:
-                i = rxbuf.index(0x0D)  # '\r'
-                frame = bytes(rxbuf[:i+1])
-                del rxbuf[:i+1]
-                return frame
-            except ValueError:
-                pass
-
-            remain = deadline - asyncio.get_running_loop().time()
-            if remain <= 0:
-                raise asyncio.TimeoutError("overall timeout")
-
-            timeout = min(interbyte, remain)
-
-            # wait for readability without blocking the event loop
-            r, _, _ = await asyncio.get_running_loop().run_in_executor(
-                None, select.select, [fd], [], [], timeout
-            )
-            if not r:
-                raise asyncio.TimeoutError("inter-byte timeout")
-
-            # non-blocking read (device may return >chunk)
-            data = os.read(fd, chunk)
-            if data:
-                rxbuf.extend(data)
-                if len(rxbuf) > max_bytes:
-                    raise ValueError("max_bytes exceeded")
-    
-    @staticmethod
-    def _encode(req : str) -> bytearray:
-        payload = bytearray(req.encode('utf-8'))
-        crc = HidrawInverter._calc_crc(payload)
-        payload.append((crc >> 8) & 0xFF)
-        payload.append(crc & 0xFF)
-        payload.append(0x0D)
-
-        return payload
+    def _on_readable(self):
+        if self._rxlen >= HidrawInverter._MAX_BYTES:
+            self._wakeup(ValueError("max_bytes exceeded"))
+            return
 
-    @staticmethod
-    def _calc_crc(data):
-        crc = 0
-
-        for i in range(len(data)):
-            da=((crc>>8) & 0xFF) >> 4
-            crc = (crc << 4) & 0xFFFF
-            index = da ^ (data[i] >> 4)
-            mask = HidrawInverter._TA[index]
-            crc = crc ^ mask
-
-            da=((crc>>8) & 0xFF) >> 4
-            crc = (crc << 4) & 0xFFFF
-            index = da ^ (data[i] & 0x0F)
-            mask = HidrawInverter._TA[index]
-            crc = crc ^ mask
-
-        if (crc & 0xFF) in HidrawInverter._FORBIDDEN_BYTES:
-            crc = crc + 0x01
-        if (crc >> 8) in HidrawInverter._FORBIDDEN_BYTES:
-            crc = crc + 0x100
-
-        return crc
\ No newline at end of file
+        try:
+            n = os.readv(self._fd, [self._rxview[self._rxlen:]])
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._wakeup(e)
+            return
+
+        if n == 0:
+            self._wakeup(OSError(f"{self._device_path} closed"))
+            return
+
+        self._rxlen += n
+        self._wakeup(None)
+
+    def _wakeup(self, exc):
+        waiter = self._waiter
+        if waiter is None or waiter.done():
+            return
+        if exc is None:
+            waiter.set_result(None)
+        else:
+            waiter.set_exception(exc)
+
+    async def _read(self, fd, overall=2.0, interbyte=0.5) -> bytes:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + overall
+        self._rxlen = 0
+
+        loop.add_reader(fd, self._on_readable)
+        try:
+            while True:
+                # already have a frame?
+                i = self._rxbuf.find(0x0D, 0, self._rxlen)  # '\r'
+                if i >= 0:
+                    if i + 1 < self._rxlen:
+                        self._stale = True
+                    return bytes(self._rxview[:i+1])
+
+                remain = deadline - loop.time()
+                if remain <= 0:
+                    raise asyncio.TimeoutError("overall timeout")
+
+                self._waiter = loop.create_future()
+                try:
+                    await asyncio.wait_for(self._waiter, min(interbyte, remain))
+                except asyncio.TimeoutError:
+                    raise asyncio.TimeoutError("inter-byte timeout")
+        finally:
+            self._waiter = None
+            loop.remove_reader(fd)
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+from bisect import bisect_right
+
+from ..capture import read_capture
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ReplayDevice:
+    """Plays a capture log back as if it was the inverter.
+
+    speed 1 follows the captured timeline in real time, speed N runs it N
+    times faster, speed 0 returns the next captured frame of the command
+    immediately. The capture loops when it runs out.
+    """
+
+    _NAK = b"(NAKxx\r"
+
+    def __init__(self, path: str, speed: float = 1.0):
+        self._path = path
+        self._speed = speed
+        self._frames = None
+        self._started = None
+
+    def _load(self):
+        path = self._path
+
+        frames = {}
+        for cmd, frame, t_start, t_end in read_capture(path):
+            frames.setdefault(cmd, []).append((t_start, t_end - t_start, frame))
+
+        if not frames:
+            raise ValueError(f"{path} has no frames")
+
+        self._frames = frames
+        self._times = {cmd: [f[0] for f in fs] for cmd, fs in frames.items()}
+        self._pos = dict.fromkeys(frames, 0)
+
+        self._t0 = min(ts[0] for ts in self._times.values())
+        self._duration = max(ts[-1] for ts in self._times.values()) - self._t0
+
+        _LOGGER.debug(
+            "Replaying %s: %d frames over %.0fs at speed %s",
+            path, sum(len(f) for f in frames.values()), self._duration, self._speed,
+        )
+
+    def close(self):
+        pass
+
+    def _next(self, cmd: str):
+        frames = self._frames[cmd]
+        pos = self._pos[cmd]
+        self._pos[cmd] = (pos + 1) % len(frames)
+        return frames[pos]
+
+    def _at(self, cmd: str, now: float):
+        if self._started is None:
+            self._started = now
+
+        elapsed = (now - self._started) * self._speed
+        if self._duration > 0:
+            elapsed %= self._duration
+
+        # the latest frame captured at that point of the timeline
+        i = bisect_right(self._times[cmd], self._t0 + elapsed) - 1
+        return self._frames[cmd][max(i, 0)]
+
+    async def query(self, cmd: str, timeout: float | None = None) -> bytes:
+        loop = asyncio.get_running_loop()
+        if self._frames is None:
+            # days of capture, keep the file read off the event loop
+            await loop.run_in_executor(None, self._load)
+
+        if cmd not in self._frames:
+            return ReplayDevice._NAK
+
+        if not self._speed:
+            return self._next(cmd)[2]
+
+        _, latency, frame = self._at(cmd, loop.time())
+
+        delay = latency / self._speed
+        if timeout is not None and delay > timeout:
+            await asyncio.sleep(timeout)
+            raise asyncio.TimeoutError("overall timeout")
+        await asyncio.sleep(delay)
+
+        return frame
@@ -0,0 +1,112 @@
+import socket
+import asyncio
+
+import logging
+
+from .. import codec
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TcpInverter():
+    """Talks to test/tcp_bridge.py over one persistent connection."""
+
+    _MIN_BACKOFF = 1.0
+    _MAX_BACKOFF = 30.0
+    _CONNECT_TIMEOUT = 5.0
+    _MAX_BYTES = 4096
+
+    def __init__(self, host: str, port: int):
+        self._host = host
+        self._port = port
+        self._reader = None
+        self._writer = None
+
+        self._backoff = TcpInverter._MIN_BACKOFF
+        self._retry_at = 0.0
+
+    def __str__(self):
+        return f"tcp://{self._host}:{self._port}"
+
+    def close(self):
+        if self._writer is not None:
+            writer, self._writer, self._reader = self._writer, None, None
+            writer.close()
+
+    @staticmethod
+    def _keepalive(sock):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        # notice a dead bridge within ~30s instead of the system default of hours
+        for opt, value in (("TCP_KEEPIDLE", 10), ("TCP_KEEPINTVL", 5), ("TCP_KEEPCNT", 3)):
+            if hasattr(socket, opt):
+                sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, opt), value)
+
+    async def _connect(self, deadline: float):
+        if self._writer is not None and not self._writer.is_closing():
+            return
+
+        self.close()
+
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if now < self._retry_at:
+            raise ConnectionError(f"{self}: reconnect in {self._retry_at - now:.1f}s")
+
+        try:
+            async with asyncio.timeout_at(min(now + TcpInverter._CONNECT_TIMEOUT, deadline)):
+                self._reader, self._writer = await asyncio.open_connection(
+                    self._host, self._port, limit=TcpInverter._MAX_BYTES
+                )
+        except (OSError, asyncio.TimeoutError) as e:
+            self._retry_at = now + self._backoff
+            self._backoff = min(self._backoff * 2, TcpInverter._MAX_BACKOFF)
+            raise ConnectionError(f"{self}: connect failed: {e}") from e
+
+        sock = self._writer.get_extra_info("socket")
+        if sock is not None:
+            self._keepalive(sock)
+
+        self._backoff = TcpInverter._MIN_BACKOFF
+        _LOGGER.debug("Connected to %s", self)
+
+    async def query(self, cmd: str, timeout: float = 2.0) -> bytes:
+        # one budget for the whole exchange, connecting included
+        deadline = asyncio.get_running_loop().time() + timeout
+        try:
+            await self._connect(deadline)
+
+            async with asyncio.timeout_at(deadline):
+                self._writer.write(codec.encode(cmd))
+                # flow control, and a dead connection shows up here rather than as a missing answer
+                await self._writer.drain()
+
+                resp = await self._reader.readuntil(b"\r")
+
+            # HID reports are zero padded, the bridge forwards the padding too
+            start = resp.find(b"(")
+            if start > 0:
+                resp = resp[start:]
+
+            if not codec.check_crc(resp):
+                raise codec.CrcMismatch("CRC missmatch")
+
+            return resp
+
+        except asyncio.TimeoutError as e:
+            # a late answer would be taken for the next one, start on a clean stream
+            self.close()
+            _LOGGER.debug(f"Error reading {cmd} from the {self}: {e}")
+            raise e
+        except OSError as e:
+            self.close()
+            _LOGGER.debug(f"Error reading {cmd} from the {self}: {e}")
+            raise e
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+            # bridge went away mid-frame or sent garbage without a '\r'
+            self.close()
+            _LOGGER.debug(f"Error reading {cmd} from the {self}: {e}")
+            raise ConnectionError(f"{self}: {e}") from e
+        except Exception as e:
+            _LOGGER.debug(f"Error reading {cmd} from the {self}: {e}")
+            raise e
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    data = hass.data[DOMAIN][entry.entry_id]
+    hub = data["hub"]
+    coordinator = data["coordinator"]
+
+    return {
+        "config": dict(entry.data),
+        "update_interval": coordinator.update_interval.total_seconds(),
+        "last_update_success": coordinator.last_update_success,
+        "link": {
+            "state": hub.breaker.state,
+            "gap": {q.cmd(): hub.pacer.gap(q.cmd()) for q in hub.queries},
+            "error_rate": {q.cmd(): hub.pacer.error_rate(q.cmd()) for q in hub.queries},
+            "rtt": {q.cmd(): hub.pacer.rtt(q.cmd()) for q in hub.queries},
+            "queue_depth": hub.worker.depth,
+            "coalesced": hub.worker.coalesced,
+        },
+        "stats": hub.stats.as_dict(),
+        "static_age": hub.static.ages(time.time()) if hub.static else None,
+        "energy_counters": hub.counters.as_dict() if hub.counters else None,
+        "data": coordinator.data,
+    }
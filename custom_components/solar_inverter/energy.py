@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorStateClass,
+)
+from homeassistant.const import UnitOfEnergy
+
+from .queries.metric import Metric
+
+
+def _watt(key):
+    return lambda d: d.get(key)
+
+
+def _volt_amp(v_key, a_key):
+    def power(d):
+        v = d.get(v_key)
+        a = d.get(a_key)
+        if v is None or a is None:
+            return None
+        return v * a
+    return power
+
+
+# energy counter -> (name, instantaneous power in W from a QPIGS snapshot)
+_SOURCES = {
+    "load_energy": ("Load Energy", _watt("load_watt")),
+    "pv_energy": ("PV Energy", _watt("pv_input_watt")),
+    "battery_charge_energy": ("Battery Charge Energy", _volt_amp("battery_voltage", "battery_charge_current")),
+    "battery_discharge_energy": ("Battery Discharge Energy", _volt_amp("battery_voltage", "battery_discharge_current")),
+}
+
+_METRICS = tuple(
+    Metric(-1, key, name, SensorDeviceClass.ENERGY, UnitOfEnergy.KILO_WATT_HOUR, SensorStateClass.TOTAL_INCREASING)
+    for key, (name, _) in _SOURCES.items()
+)
+
+
+class EnergyAccumulator:
+    """Integrates power readings into kWh counters at the rate they are sampled.
+
+    Trapezoidal rule between consecutive samples of the same query. A gap
+    longer than `max_gap` (device down, HA paused) is not bridged.
+    """
+
+    def __init__(self, query, max_gap: float = 60.0):
+        self._query = query
+        self._max_gap = max_gap
+
+        self._totals = dict.fromkeys(_SOURCES, 0.0)
+        self._last_t = None
+        self._last_p = dict.fromkeys(_SOURCES)
+
+    @property
+    def query(self):
+        return self._query
+
+    def metrics(self) -> tuple[Metric, ...]:
+        return _METRICS
+
+    def add(self, t: float, parsed: dict):
+        dt = None if self._last_t is None else t - self._last_t
+        bridge = dt is not None and 0 < dt <= self._max_gap
+
+        for key, (_, power) in _SOURCES.items():
+            p = power(parsed)
+            prev = self._last_p[key]
+            if bridge and p is not None and prev is not None:
+                # W * s -> kWh
+                self._totals[key] += (prev + p) * 0.5 * dt / 3_600_000
+            self._last_p[key] = p
+
+        self._last_t = t
+
+    def values(self) -> dict:
+        return {key: round(total, 3) for key, total in self._totals.items()}
+
+    def as_dict(self) -> dict:
+        return dict(self._totals)
+
+    def restore(self, data: dict | None):
+        for key, total in (data or {}).items():
+            if key in self._totals:
+                self._totals[key] = float(total)
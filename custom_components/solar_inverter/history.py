@@ -0,0 +1,204 @@
+"""Column-per-metric sample history, one directory per day.
+
+<root>/<YYYY-MM-DD>/t.f64 holds the sample times (float64, seconds since
+the epoch), <key>.f32 one float32 per sample for each metric, NaN where
+a reading was missing. Rows are fixed width, so sample i of every column
+sits at i * itemsize and the files are read through mmap without parsing.
+
+Kept free of Home Assistant imports; write() and query() do file I/O and
+belong in an executor.
+"""
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import shutil
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+_NAN = float("nan")
+_TIME_FILE = "t.f64"
+
+
+def _day(t: float) -> str:
+    return time.strftime("%Y-%m-%d", time.localtime(t))
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+class _Column:
+    """A column file mapped read-only; an empty or missing file reads as no rows."""
+
+    def __init__(self, path: str, typecode: str):
+        self._mm = None
+        self.view = memoryview(b"").cast(typecode)
+        try:
+            with open(path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return
+        self.view = memoryview(self._mm).cast(typecode)
+
+    def close(self):
+        self.view.release()
+        if self._mm is not None:
+            self._mm.close()
+
+
+class HistoryStore:
+    def __init__(self, root: str, keys, keep_days: int = 90):
+        self._root = root
+        self._keys = tuple(keys)
+        self._keep_days = keep_days
+
+        self._t = array("d")
+        self._cols = {k: array("f") for k in self._keys}
+
+    @property
+    def keys(self) -> tuple[str, ...]:
+        return self._keys
+
+    @property
+    def pending(self) -> int:
+        return len(self._t)
+
+    def append(self, t: float, data: dict):
+        """Buffer one snapshot in memory, cheap enough for the event loop."""
+        self._t.append(t)
+        for key, col in self._cols.items():
+            v = data.get(key)
+            col.append(_NAN if v is None else v)
+
+    def take(self) -> tuple:
+        """Hand the buffered rows over for write(), the buffer starts empty."""
+        rows = (self._t, self._cols)
+        self._t = array("d")
+        self._cols = {k: array("f") for k in self._keys}
+        return rows
+
+    def write(self, rows: tuple):
+        times, cols = rows
+        start = 0
+        while start < len(times):
+            day = _day(times[start])
+            end = start + 1
+            while end < len(times) and _day(times[end]) == day:
+                end += 1
+            self._write_day(day, times[start:end], {k: c[start:end] for k, c in cols.items()})
+            start = end
+
+    def _write_day(self, day: str, times: array, cols: dict):
+        if day < self._cutoff():
+            return
+
+        path = os.path.join(self._root, day)
+        if not os.path.isdir(path):
+            os.makedirs(path, exist_ok=True)
+            self._prune()
+
+        time_path = os.path.join(path, _TIME_FILE)
+        rows = _size(time_path) // times.itemsize
+
+        for key, values in cols.items():
+            col_path = os.path.join(path, f"{key}.f32")
+            with open(col_path, "ab") as f:
+                size = f.tell()
+                have = min(size // values.itemsize, rows)
+                if size != have * values.itemsize:
+                    # rows written before a crash cut off their times, or a torn one
+                    f.truncate(have * values.itemsize)
+                # a metric added since the day began starts with NaN rows
+                if have < rows:
+                    (array("f", [_NAN]) * (rows - have)).tofile(f)
+                values.tofile(f)
+
+        # times last: a row exists once its time does
+        with open(time_path, "ab") as f:
+            if f.tell() != rows * times.itemsize:
+                f.truncate(rows * times.itemsize)
+            times.tofile(f)
+
+    def _cutoff(self) -> str:
+        return _day(time.time() - self._keep_days * 86400)
+
+    def _prune(self):
+        cutoff = self._cutoff()
+        for name in os.listdir(self._root):
+            if name < cutoff and os.path.isdir(os.path.join(self._root, name)):
+                shutil.rmtree(os.path.join(self._root, name), ignore_errors=True)
+
+    def _days(self, start: float, end: float):
+        first, last = _day(start), _day(end)
+        try:
+            names = sorted(os.listdir(self._root))
+        except FileNotFoundError:
+            return []
+        return [n for n in names if first <= n <= last]
+
+    def query(self, start: float, end: float, keys=None, step: float | None = None) -> dict:
+        """Samples with start <= t <= end.
+
+        Without `step` every sample: {"t": [...], key: [...]}. With `step`
+        (seconds) buckets from `start`: {"t": [...], key: {"mean", "min",
+        "max"}}, empty buckets left out.
+        """
+        keys = [k for k in (keys or self._keys) if k in self._keys]
+        times = []
+        values = {k: [] for k in keys}
+
+        for day in self._days(start, end):
+            path = os.path.join(self._root, day)
+            t_col = _Column(os.path.join(path, _TIME_FILE), "d")
+            try:
+                lo = bisect_left(t_col.view, start)
+                hi = bisect_right(t_col.view, end)
+                if lo >= hi:
+                    continue
+                times.extend(t_col.view[lo:hi].tolist())
+
+                for key in keys:
+                    col = _Column(os.path.join(path, f"{key}.f32"), "f")
+                    try:
+                        got = col.view[lo:min(hi, len(col.view))].tolist()
+                    finally:
+                        col.close()
+                    values[key].extend(got + [_NAN] * (hi - lo - len(got)))
+            finally:
+                t_col.close()
+
+        if step:
+            return _downsample(times, values, start, step)
+
+        return {"t": times} | {
+            k: [None if math.isnan(v) else round(v, 3) for v in vs] for k, vs in values.items()
+        }
+
+
+def _downsample(times: list, values: dict, start: float, step: float) -> dict:
+    buckets = {}
+    for i, t in enumerate(times):
+        buckets.setdefault(int((t - start) // step), []).append(i)
+
+    out = {"t": [start + b * step for b in buckets]}
+    for key, vs in values.items():
+        mean, lo, hi = [], [], []
+        for rows in buckets.values():
+            got = [vs[i] for i in rows if not math.isnan(vs[i])]
+            if got:
+                mean.append(round(sum(got) / len(got), 3))
+                lo.append(round(min(got), 3))
+                hi.append(round(max(got), 3))
+            else:
+                mean.append(None)
+                lo.append(None)
+                hi.append(None)
+        out[key] = {"mean": mean, "min": lo, "max": hi}
+    return out
@@ -1,33 +1,201 @@
 from __future__ import annotations
 
 import asyncio
+import time
 
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
 
 import logging
 from typing import Dict
-from .devices import fake, hidraw
+from urllib.parse import urlsplit, parse_qs
+from .devices import fake, hidraw, replay, tcp
 from .queries import QUERIES
+from .queries.pi30 import QPIWS, WARNINGS
+from .scheduler import QuerySchedule
+from .pacer import AdaptivePacer
+from .breaker import CircuitBreaker
+from .codec import CrcMismatch, encode
+from .stats import PollStats
+from .stream import MetricStream
+from .energy import EnergyAccumulator
+from .static import StaticCache
+from .history import HistoryStore
+from .profiler import CycleProfiler
+from .parallel import ParallelGroup
+from .counters import EnergyCounters
+from .statistics import HourlyStatistics
+from .worker import DeviceWorker, CONTROL, INTERACTIVE, POLL
+from .const import DOMAIN, DEFAULT_HEARTBEAT, DEFAULT_SCAN_INTERVAL, EVENT_WARNING
 
 
 _LOGGER = logging.getLogger(__name__)
     
-def _strip_frame(resp: bytes) -> str:
-    return resp[1:-3].decode() # remove leading '(' and trailing CRC+'\r'
+_MISSING = object()
+
+# energy counters change every cycle, write them out at most this often (seconds)
+_ENERGY_SAVE_DELAY = 60
+
+# buffered history rows are written out this often (seconds)
+_HISTORY_FLUSH = 60
+
+# cached settings are written out this long after a refresh (seconds)
+_STATIC_SAVE_DELAY = 10
+
+# the current day/month/year/total counters are read this often (seconds)
+_COUNTERS_LIVE = 300
+
+# one missing closed period is read at most this often, doubling up to
+# _BACKFILL_MAX_GAP while the device does not answer them (seconds)
+_BACKFILL_GAP = 10
+_BACKFILL_MAX_GAP = 3600
+
+# QMOD key, settings are read again after the mode changes
+_MODE_KEY = "mode"
+
+# share of the poll interval a cycle may take before remaining queries are deferred
+_CYCLE_BUDGET = 0.8
+
+_WARNINGS_KEY = QPIWS.metrics()[0].uuid
+_WARNING_NAMES = tuple(WARNINGS)
+_ALL_WARNINGS = (1 << len(_WARNING_NAMES)) - 1
+
+
+def _make_device(path: str):
+    if path == "fake":
+        return fake.FakeDevice()
+
+    url = urlsplit(path)
+    if url.scheme == "replay":
+        # replay:/path/to/capture.pi30?speed=10, speed=0 is as fast as possible
+        params = parse_qs(url.query)
+        speed = float(params.get("speed", ["1"])[0])
+        return replay.ReplayDevice(url.path, speed=speed)
+
+    if url.scheme == "tcp":
+        # tcp://host:port of test/tcp_bridge.py
+        return tcp.TcpInverter(url.hostname, url.port)
+
+    return hidraw.HidrawInverter(path)
+
+
+def _strip_frame(resp: bytes) -> bytes:
+    return resp[1:-3] # remove leading '(' and trailing CRC+'\r'
+
+
+def _statistics_meta(name: str, statistics: HourlyStatistics) -> dict:
+    # the recorder is only needed with statistics on
+    from homeassistant.components.recorder.models import StatisticMeanType, StatisticMetaData
+    from homeassistant.components.sensor.const import UNIT_CONVERTERS
+
+    # external statistic ids: solar_inverter:<inverter>_<metric>
+    meta = {}
+    for metric, has_sum in [(m, False) for m in statistics.means] + [(m, True) for m in statistics.sums]:
+        converter = UNIT_CONVERTERS.get(metric.dc)
+        meta[metric.uuid] = StatisticMetaData(
+            mean_type=StatisticMeanType.NONE if has_sum else StatisticMeanType.ARITHMETIC,
+            has_sum=has_sum,
+            name=f"{name} {metric.name}",
+            source=DOMAIN,
+            statistic_id=f"{DOMAIN}:{slugify(name)}_{metric.uuid}",
+            unit_of_measurement=metric.uom,
+            # lets the recorder convert units, None for plain numbers
+            unit_class=converter.UNIT_CLASS if converter else None,
+        )
+    return meta
 
 
 class InverterHub:
-    def __init__(self, hass, path: str, name: str, queries : list):
+    def __init__(self, hass, path: str, name: str, queries : list, schedule: QuerySchedule | None = None,
+                 heartbeat: float = DEFAULT_HEARTBEAT, device=None,
+                 interval: float | None = None, stream: MetricStream | None = None,
+                 energy: EnergyAccumulator | None = None, entry_id: str | None = None,
+                 static: StaticCache | None = None, history: HistoryStore | None = None,
+                 group: ParallelGroup | None = None, counters: EnergyCounters | None = None,
+                 statistics: HourlyStatistics | None = None):
         self.hass = hass
         self.name = name
         
-        if path == "fake":
-            self._dev = fake.FakeDevice()
-        else:
-            self._dev = hidraw.HidrawInverter(path)
+        self._dev = device if device is not None else _make_device(path)
         
         self._queries = queries
+        self._stream = stream
+        self._stream_task = None
+        self._energy = energy
+        self._energy_store = None
+        if energy is not None and entry_id is not None:
+            self._energy_store = Store(hass, 1, f"{DOMAIN}.{entry_id}.energy")
+        self._static = static
+        self._static_store = None
+        if static is not None and entry_id is not None:
+            self._static_store = Store(hass, 1, f"{DOMAIN}.{entry_id}.static")
+        # what entities showed at the last shutdown, shown again until the first poll
+        self._snapshot_store = None
+        if entry_id is not None:
+            self._snapshot_store = Store(hass, 1, f"{DOMAIN}.{entry_id}.snapshot")
+        self._restored: dict | None = None
+        self._stale_since: float | None = None
+        self._answers = 0
+        self._group = group
+        self._counters = counters
+        self._counters_store = None
+        if counters is not None and entry_id is not None:
+            self._counters_store = Store(hass, 1, f"{DOMAIN}.{entry_id}.counters")
+        self._counters_at: float | None = None
+        # commands sent so far this cycle, the pacer gap goes between them
+        self._cycle_sent = 0
+        self._backfill_at = 0.0
+        self._backfill_gap = _BACKFILL_GAP
+        self._statistics = statistics
+        self._statistics_meta = {}
+        if statistics is not None:
+            self._statistics_meta = _statistics_meta(name, statistics)
+        self._history = history
+        self._history_write = None
+        self._history_flushed = 0.0
+        self._profiler: CycleProfiler | None = None
+        self._profiled = None
+        # owns the device, the poll cycle, the stream and services queue on it
+        self._worker = DeviceWorker(self._dev, name)
+
+        if schedule is None:
+            # a streamed query is sampled by its own task, cached ones when they are due
+            skip = set(static.queries) if static is not None else set()
+            if stream is not None:
+                skip.add(stream.query)
+            schedule = QuerySchedule.every_slot([q for q in queries if q not in skip])
+        self._schedule = schedule
+        self._pacer = AdaptivePacer()
+
+        interval = interval or self._schedule.tick or DEFAULT_SCAN_INTERVAL
+        self._cycle_budget = interval * _CYCLE_BUDGET
+        self._breaker = CircuitBreaker(name, base_backoff=max(interval, 5.0))
+        self._stats = PollStats(interval)
+        # queries run on different tiers, keep the latest values of all of them
+        self._data: Dict[str, dict] = {}
+
+        # what entities currently show, values inside a metric deadband are held back
+        metrics = [m for q in queries for m in q.metrics()]
+        if stream is not None:
+            metrics += stream.metrics()
+        if energy is not None:
+            metrics += energy.metrics()
+        if group is not None:
+            metrics += group.metrics()
+        if counters is not None:
+            metrics += counters.metrics()
+        self._deadbands = {m.uuid: m.deadband for m in metrics if m.deadband}
+        self._heartbeat = heartbeat
+        self._published: Dict[str, object] = {}
+        self._published_at: Dict[str, float] = {}
+        self._changed: frozenset[str] = frozenset()
+        # last published QPIWS mask and the bits that flipped with it
+        self._warnings: int | None = None
+        self._flipped = 0
+
         self._unsub_stop = None
 
     async def async_init(self):        
@@ -36,29 +204,574 @@ class InverterHub:
             lambda evt: self.hass.async_create_task(self.async_close())
         )
 
+        if self._energy_store is not None:
+            self._energy.restore(await self._energy_store.async_load())
+
+        if self._static_store is not None:
+            self._static.restore(await self._static_store.async_load())
+            self._data |= self._static.values()
+
+        if self._counters_store is not None:
+            self._counters.restore(await self._counters_store.async_load())
+
+        if self._snapshot_store is not None:
+            snapshot = await self._snapshot_store.async_load()
+            self._restore(snapshot)
+            if self._statistics is not None and snapshot:
+                self._statistics.restore(snapshot.get("statistics"))
+
+        if self._stream is not None:
+            self._stream_task = self.hass.async_create_background_task(
+                self._async_stream(), f"{self.name} {self._stream.query.cmd()} stream"
+            )
+
     async def async_close(self):
         if self._unsub_stop:
             self._unsub_stop()
             self._unsub_stop = None
 
+        if self._stream_task is not None:
+            self._stream_task.cancel()
+            self._stream_task = None
+
+        self._cancel_profile()
+
+        if self._energy_store is not None:
+            await self._energy_store.async_save(self._energy.as_dict())
+
+        if self._static_store is not None:
+            await self._static_store.async_save(self._static.as_dict())
+
+        if self._counters_store is not None:
+            await self._counters_store.async_save(self._counters.as_dict())
+
+        if self._history is not None:
+            await self._async_flush_history()
+
+        if self._snapshot_store is not None and (self._published or self._statistics is not None):
+            snapshot = {
+                # still showing the restored values, keep when they were real
+                "saved_at": self._stale_since or time.time(),
+                "data": self._published,
+            }
+            if self._statistics is not None:
+                # the running hour and any not imported yet carry over the restart
+                snapshot["statistics"] = self._statistics.as_dict()
+            await self._snapshot_store.async_save(snapshot)
+
+        self._worker.close()
+
     async def async_poll_all(self) -> Dict[str, dict]:
-        data: Dict[str, dict] = {}
-        for query in self._queries:
-            try:
-                raw = await self._dev.query(query.cmd())
-                parsed = self._parse(query, raw)
-                data |= parsed
-            except Exception as e:
-                _LOGGER.warning("Query %s failed: %s", query.cmd(), e)
-            await asyncio.sleep(0.1)
-
-        return data
+        profiler = self._profiler
+        if profiler is None:
+            return await self._async_poll()
+
+        try:
+            profiler.begin()
+        except Exception as e:
+            # e.g. another profiler is active (one per process on 3.12+), polling goes on without
+            self._profiler = None
+            profiler.finish()
+            self._profiled.set_exception(RuntimeError(f"{self.name}: profiling did not start: {e}"))
+            return await self._async_poll()
+
+        try:
+            return await self._async_poll()
+        finally:
+            # stop after the coordinator handed the data to the entities, their writes count too
+            asyncio.get_running_loop().call_soon(self._end_profile, profiler)
+
+    def _end_profile(self, profiler: CycleProfiler):
+        if not profiler.end():
+            return
+        self._profiler = None
+        profiler.finish()
+        self._profiled.set_result(profiler)
+
+    def start_profile(self, cycles: int, trace_memory: bool) -> asyncio.Future:
+        """Profile the next `cycles` polls; the future gets the finished CycleProfiler."""
+        if self._profiler is not None:
+            raise RuntimeError(f"{self.name} is being profiled already")
+
+        self._profiler = CycleProfiler(self.name, cycles, trace_memory)
+        self._profiled = asyncio.get_running_loop().create_future()
+        return self._profiled
+
+    def _cancel_profile(self):
+        if self._profiler is not None:
+            self._profiler.finish()
+            self._profiler = None
+            self._profiled.cancel()
+
+    async def _async_poll(self) -> Dict[str, dict]:
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        # a cycle that fails publishes nothing, entities must not rewrite the last diff
+        self._changed = frozenset()
+        self._flipped = 0
+
+        if not self._breaker.allow(now):
+            raise UpdateFailed(
+                f"{self.name}: device unreachable, next probe in {self._breaker.retry_at - now:.0f}s"
+            )
+
+        deadline = now + self._cycle_budget
+        self._cycle_sent = 0
+        due = self._schedule.due(now)
+        # answered this cycle, self._data also holds older readings
+        fresh = {}
+        for i, entry in enumerate(due):
+            timeout = await self._async_turn(entry.query, deadline)
+            if timeout is None:
+                # device is gone or the cycle ran out of time, defer the rest to the next slot
+                for skipped in due[i:]:
+                    self._schedule.retry(skipped, now)
+                break
+
+            parsed = await self._exchange(entry.query, timeout, deadline=deadline)
+            if parsed is None:
+                self._schedule.retry(entry, now)
+            else:
+                self._check_mode(parsed)
+                self._data |= parsed
+                fresh |= parsed
+
+        if self._group is not None:
+            await self._async_sweep(deadline)
+
+        if self._static is not None:
+            await self._async_refresh_static(deadline)
+
+        if self._counters is not None:
+            await self._async_counters(deadline)
+
+        window = None
+        if self._stream is not None:
+            window = self._stream.window()
+            self._data |= window
+
+        if self._energy is not None:
+            self._data |= self._energy.values()
+            if self._energy_store is not None:
+                self._energy_store.async_delay_save(self._energy.as_dict, _ENERGY_SAVE_DELAY)
+
+        self._stats.cycle(loop.time() - now)
+
+        if self._breaker.state == CircuitBreaker.OPEN:
+            raise UpdateFailed(f"{self.name}: device unreachable")
+
+        if self._history is not None:
+            self._history.append(time.time(), self._data)
+            self._flush_history(loop.time())
+
+        if self._statistics is not None:
+            if self._energy is not None:
+                # a counter keeps its value between answers
+                fresh |= self._energy.values()
+            self._statistics.add(time.time(), fresh, window)
+            self._push_statistics()
+
+        self._changed = self._diff(loop.time())
+        if self._stale_since is not None and self._answers:
+            # first real answer, every entity drops the stale mark
+            self._stale_since = None
+            self._restored = None
+            self._changed = frozenset(self._published)
+        if _WARNINGS_KEY in self._changed:
+            self._on_warnings(self._published[_WARNINGS_KEY])
+
+        return dict(self._published)
+
+    async def _exchange(self, query, timeout: float, priority: int = POLL, when=None,
+                        nak: dict | None = None, deadline: float | None = None) -> dict | None:
+        """One device round-trip with pacing, breaker and stats bookkeeping; None if it failed.
+
+        A caller expecting refusals passes `nak`, returned for a NAK instead of a failure.
+        `deadline` (loop time) bounds the whole wait, queueing behind other
+        callers included, not only the frame on the wire.
+        """
+        loop = asyncio.get_running_loop()
+        cmd = query.cmd()
+        if when is None and query.dated:
+            # today as HA sees it, the host may run in another zone (UTC containers)
+            when = dt_util.now()
+        request = query.request(when)
+        # shorter than this, the cycle budget clipped the timeout, not the device
+        device_timeout = self._pacer.timeout(cmd)
+
+        try:
+            async with asyncio.timeout_at(deadline):
+                raw, rtt = await self._worker.request(request, timeout, priority)
+            self._breaker.success()
+            self._stats.exchange(cmd, rtt, len(encode(request)), len(raw))
+
+            if _strip_frame(raw) == b"NAK":
+                if nak is not None:
+                    _LOGGER.debug("%s: %s refused", self.name, request)
+                    self._pacer.success(cmd, rtt)
+                    return nak
+                self._on_failure(cmd, "nak", "NAK")
+                return None
+
+            parsed = self._parse(query, raw)
+            self._pacer.success(cmd, rtt)
+            self._answers += 1
+
+            if self._energy is not None and query is self._energy.query:
+                self._energy.add(loop.time(), parsed)
+
+            return parsed
+        except asyncio.TimeoutError as e:
+            if timeout < device_timeout or (deadline is not None and loop.time() >= deadline):
+                # out of cycle budget, the device may be fine: the caller retries it later
+                _LOGGER.debug("%s: %s cut off by the cycle deadline", self.name, cmd)
+                self._stats.error(cmd, "deadline")
+            else:
+                self._breaker.failure(loop.time())
+                self._on_failure(cmd, "timeout", e)
+        except CrcMismatch as e:
+            # garbled, but the device answered
+            self._breaker.success()
+            self._on_failure(cmd, "crc", e)
+        except OSError as e:
+            self._breaker.failure(loop.time())
+            self._on_failure(cmd, "error", e)
+        except Exception as e:
+            self._on_failure(cmd, "error", e)
+
+        return None
+
+    def _flush_history(self, now: float):
+        if now - self._history_flushed < _HISTORY_FLUSH:
+            return
+        if self._history_write is not None and not self._history_write.done():
+            # the disk is slow, rows keep buffering until the last write is done
+            return
+
+        self._history_flushed = now
+        self._history_write = self.hass.async_add_executor_job(
+            self._history.write, self._history.take()
+        )
+
+    def _push_statistics(self):
+        """Import the closed hours, one batch per metric; they wait while the recorder is not up."""
+        if not self._statistics.pending or "recorder" not in self.hass.config.components:
+            return
+
+        from homeassistant.components.recorder.models import StatisticData
+        from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+        rows = self._statistics.take()
+        for metric in self._statistics.means:
+            key = metric.uuid
+            batch = [
+                StatisticData(
+                    start=dt_util.utc_from_timestamp(hour), mean=means[key][0], min=means[key][1], max=means[key][2]
+                )
+                for hour, means, _ in rows if key in means
+            ]
+            if batch:
+                async_add_external_statistics(self.hass, self._statistics_meta[key], batch)
+
+        for metric in self._statistics.sums:
+            key = metric.uuid
+            # the counters never reset, the reading is the running sum
+            batch = [
+                StatisticData(start=dt_util.utc_from_timestamp(hour), state=sums[key], sum=sums[key])
+                for hour, _, sums in rows if key in sums
+            ]
+            if batch:
+                async_add_external_statistics(self.hass, self._statistics_meta[key], batch)
+
+    async def _async_flush_history(self):
+        if self._history_write is not None:
+            await self._history_write
+            self._history_write = None
+        if self._history.pending:
+            await self.hass.async_add_executor_job(self._history.write, self._history.take())
+
+    async def async_history(self, start: float, end: float, keys=None, step: float | None = None) -> dict:
+        """Stored samples between two wall clock times, downsampled to `step` seconds if given."""
+        if self._history is None:
+            return {}
+        await self._async_flush_history()
+        return await self.hass.async_add_executor_job(self._history.query, start, end, keys, step)
+
+    def _restore(self, snapshot: dict | None):
+        if not snapshot or not snapshot.get("data"):
+            return
+
+        now = asyncio.get_running_loop().time()
+        data = snapshot["data"]
+        # fresher values restored before (cached settings) win
+        self._data = data | self._data
+        self._published = dict(self._data)
+        self._published_at = dict.fromkeys(self._published, now)
+        self._restored = dict(self._published)
+        self._stale_since = snapshot.get("saved_at") or time.time()
+
+    async def _async_turn(self, query, deadline: float) -> float | None:
+        """Wait the command's pacer gap before a cycle command, then its timeout.
+
+        None once the breaker opened or the cycle budget ran out. The gap
+        separates every command of the cycle, whichever pass sends it.
+        """
+        loop = asyncio.get_running_loop()
+        remain = deadline - loop.time()
+        if self._breaker.state == CircuitBreaker.OPEN or remain <= 0:
+            return None
+
+        gap = self._pacer.gap(query.cmd())
+        if self._cycle_sent and gap:
+            await asyncio.sleep(min(gap, remain))
+        self._cycle_sent += 1
+        return min(self._pacer.timeout(query.cmd()), max(deadline - loop.time(), 0.05))
+
+    async def _async_sweep(self, deadline: float):
+        """Read every unit of the parallel group, then the group totals in one pass."""
+        units = []
+
+        for query in self._group.queries:
+            timeout = await self._async_turn(query, deadline)
+            if timeout is None:
+                # totals of a partial sweep would be wrong, keep the last ones
+                return
+
+            parsed = await self._exchange(query, timeout, deadline=deadline)
+            if parsed is not None:
+                self._data |= parsed
+            units.append(parsed)
+
+        self._data |= self._group.aggregate(units)
+
+    async def _async_refresh_static(self, deadline: float):
+        """Re-read cached queries that are due, with whatever is left of the cycle budget."""
+        wall = time.time()
+
+        for query in self._static.due(wall):
+            timeout = await self._async_turn(query, deadline)
+            if timeout is None:
+                # still due, the next cycle picks it up
+                break
+
+            parsed = await self._exchange(query, timeout, deadline=deadline)
+            if parsed is None:
+                self._static.retry(query, wall)
+                continue
+
+            self._static.update(query, wall, parsed)
+            self._data |= parsed
+            if self._static_store is not None:
+                self._static_store.async_delay_save(self._static.as_dict, _STATIC_SAVE_DELAY)
+
+    async def _async_counters(self, deadline: float):
+        """Live energy counters when due, then at most one missing closed period."""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        today = dt_util.now().date()
+
+        if self._counters_at is None or now - self._counters_at >= _COUNTERS_LIVE:
+            self._counters_at = now
+            for query in self._counters.live:
+                timeout = await self._async_turn(query, deadline)
+                if timeout is None:
+                    # the rest waits for the next round
+                    break
+                parsed = await self._exchange(query, timeout, when=today, deadline=deadline)
+                if parsed is not None:
+                    self._data |= parsed
+
+        missing = self._counters.missing(today) if now >= self._backfill_at else None
+        if missing is not None:
+            query, when, period, key = missing
+            timeout = await self._async_turn(query, deadline)
+            if timeout is not None:
+                # a NAK'd or empty period is stored as unavailable, not asked for again
+                parsed = await self._exchange(query, timeout, when=when, nak={}, deadline=deadline)
+                if parsed is None:
+                    self._backfill_gap = min(self._backfill_gap * 2, _BACKFILL_MAX_GAP)
+                else:
+                    self._backfill_gap = _BACKFILL_GAP
+                    self._counters.store(period, key, parsed)
+                    if self._counters_store is not None:
+                        self._counters_store.async_delay_save(self._counters.as_dict, _STATIC_SAVE_DELAY)
+                self._backfill_at = loop.time() + self._backfill_gap
+
+        self._data |= self._counters.values(today)
+
+    def _check_mode(self, parsed: dict):
+        mode = parsed.get(_MODE_KEY)
+        prev = self._data.get(_MODE_KEY)
+        if self._static is not None and mode and prev and mode != prev:
+            _LOGGER.debug("%s: mode %s -> %s, re-reading settings", self.name, prev, mode)
+            self._static.invalidate()
+
+    async def async_read(self, query) -> dict | None:
+        """On-demand read, ahead of queued polls; None if it failed."""
+        parsed = await self._exchange(query, self._pacer.timeout(query.cmd()), INTERACTIVE)
+        if parsed is not None:
+            self._data |= parsed
+        return parsed
+
+    async def async_command(self, cmd: str, timeout: float = 2.0) -> str:
+        """Send a setter ahead of everything queued, returns the answer (ACK/NAK)."""
+        raw, _ = await self._worker.request(cmd, timeout, CONTROL)
+        answer = _strip_frame(raw).decode(errors="replace")
+        if answer == "ACK":
+            # a setting changed, the cached ones are outdated
+            self.refresh_static()
+        return answer
+
+    def refresh_static(self):
+        """Re-read the cached queries in the next cycle."""
+        if self._static is not None:
+            self._static.invalidate()
+
+    def _on_failure(self, cmd: str, reason: str, e):
+        if self._breaker.state == CircuitBreaker.CLOSED:
+            _LOGGER.warning("Query %s failed: %s", cmd, e)
+        else:
+            _LOGGER.debug("Query %s failed: %s", cmd, e)
+        self._pacer.failure(cmd, reason)
+        self._stats.error(cmd, reason)
+
+    async def _async_stream(self):
+        """Sample the streamed query back to back, as fast as the device answers."""
+        loop = asyncio.get_running_loop()
+        query = self._stream.query
+        cmd = query.cmd()
+
+        while True:
+            now = loop.time()
+            if not self._breaker.allow(now):
+                await asyncio.sleep(max(self._breaker.retry_at - now, 0.1))
+                continue
+
+            parsed = await self._exchange(query, self._pacer.timeout(cmd))
+            if parsed is not None:
+                self._stream.add(loop.time(), parsed)
+
+            # always yield, so a waiting poll cycle gets the device
+            await asyncio.sleep(self._pacer.gap(cmd))
+
+    @property
+    def pacer(self) -> AdaptivePacer:
+        return self._pacer
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    @property
+    def stream(self) -> MetricStream | None:
+        return self._stream
+
+    @property
+    def energy(self) -> EnergyAccumulator | None:
+        return self._energy
+
+    @property
+    def worker(self) -> DeviceWorker:
+        return self._worker
+
+    @property
+    def group(self) -> ParallelGroup | None:
+        return self._group
+
+    @property
+    def counters(self) -> EnergyCounters | None:
+        return self._counters
+
+    @property
+    def statistics(self) -> HourlyStatistics | None:
+        return self._statistics
+
+    @property
+    def history(self) -> HistoryStore | None:
+        return self._history
+
+    @property
+    def static(self) -> StaticCache | None:
+        return self._static
+
+    @property
+    def stats(self) -> PollStats:
+        return self._stats
+
+    @property
+    def queries(self) -> list:
+        return self._queries
+
+    @property
+    def restored(self) -> dict | None:
+        """Data restored from the last shutdown, until the first poll replaces it."""
+        return self._restored
+
+    @property
+    def stale_since(self) -> float | None:
+        """Wall clock time of the restored data, None once the device answered."""
+        return self._stale_since
+
+    @property
+    def warnings_flipped(self) -> int:
+        """QPIWS bits that flipped in the last poll."""
+        return self._flipped
+
+    @property
+    def changed(self) -> frozenset[str]:
+        """Keys whose published value changed in the last poll."""
+        return self._changed
+
+    def _diff(self, now: float) -> frozenset[str]:
+        changed = []
+        published = self._published
+        published_at = self._published_at
+
+        for key, value in self._data.items():
+            prev = published.get(key, _MISSING)
+            if prev is not _MISSING and now - published_at[key] < self._heartbeat:
+                if prev == value or self._in_deadband(key, prev, value):
+                    continue
+
+            published[key] = value
+            published_at[key] = now
+            changed.append(key)
+
+        if len(published) > len(self._data):
+            # gone from the data: unpublish, so its return is written even if unchanged
+            for key in published.keys() - self._data.keys():
+                del published[key]
+                published_at.pop(key, None)
+                changed.append(key)
+
+        return frozenset(changed)
+
+    def _on_warnings(self, mask: int | None):
+        prev, self._warnings = self._warnings, mask
+        if mask is None or prev is None:
+            # unreadable, or the first reading after start: every entity rewrites, no events
+            self._flipped = _ALL_WARNINGS
+            return
+
+        self._flipped = flipped = prev ^ mask
+        while flipped:
+            low = flipped & -flipped
+            flipped ^= low
+            bit = low.bit_length() - 1
+            self.hass.bus.async_fire(EVENT_WARNING, {
+                "inverter": self.name,
+                "warning": _WARNING_NAMES[bit] if bit < len(_WARNING_NAMES) else f"bit_{bit}",
+                "active": bool(mask & low),
+            })
+
+    def _in_deadband(self, key: str, prev, value) -> bool:
+        deadband = self._deadbands.get(key)
+        if not deadband or prev is None or value is None:
+            return False
+        try:
+            return abs(value - prev) < deadband
+        except TypeError:
+            return False
     
     def _parse(self, query, raw: bytes) -> dict:
-        body = _strip_frame(raw)
-        if body == "NAK":
-            return {"ok": False}
-        
-        parts = body.split()
-        
-        return query.parse(parts)
\ No newline at end of file
+        return query.parse(_strip_frame(raw))
\ No newline at end of file
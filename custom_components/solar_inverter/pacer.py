@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import logging
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AdaptivePacer:
+    """Gap before each command and read timeouts, learned from the device.
+
+    Everything is kept per command: one that keeps failing (a long QPIRI
+    frame on a flaky link) backs off alone instead of slowing the others.
+    A command's gap shrinks while it gets clean answers and doubles on its
+    NAKs, CRC mismatches and timeouts. Read timeouts follow its measured
+    turnaround, capped by the protocol worst case.
+    """
+
+    _ALPHA = 0.2        # EWMA weight of a new sample
+    _TIGHTEN = 0.75     # gap multiplier after a clean exchange
+    _BACKOFF = 2.0      # gap multiplier after a failed one
+    _MIN_BACKOFF = 0.05
+    _TIMEOUT_FACTOR = 3.0
+    _TIMEOUT_MARGIN = 0.2
+    _WARMUP = 5         # samples before the timeout is trusted to the EWMA
+
+    def __init__(self, initial_gap: float = 0.1, max_gap: float = 1.0,
+                 min_timeout: float = 0.5, max_timeout: float = 2.0):
+        self._initial_gap = initial_gap
+        self._max_gap = max_gap
+        self._min_timeout = min_timeout
+        self._max_timeout = max_timeout
+
+        self._rtt: dict[str, float] = {}
+        self._samples: dict[str, int] = {}
+        self._gap: dict[str, float] = {}
+        self._error_rate: dict[str, float] = {}
+
+    def gap(self, cmd: str) -> float:
+        return self._gap.get(cmd, self._initial_gap)
+
+    def error_rate(self, cmd: str) -> float:
+        return self._error_rate.get(cmd, 0.0)
+
+    def rtt(self, cmd: str) -> float | None:
+        return self._rtt.get(cmd)
+
+    def timeout(self, cmd: str) -> float:
+        rtt = self._rtt.get(cmd)
+        if rtt is None or self._samples[cmd] < AdaptivePacer._WARMUP:
+            return self._max_timeout
+
+        timeout = rtt * AdaptivePacer._TIMEOUT_FACTOR + AdaptivePacer._TIMEOUT_MARGIN
+        return min(self._max_timeout, max(self._min_timeout, timeout))
+
+    def success(self, cmd: str, rtt: float):
+        prev = self._rtt.get(cmd)
+        self._rtt[cmd] = rtt if prev is None else prev + AdaptivePacer._ALPHA * (rtt - prev)
+        self._samples[cmd] = self._samples.get(cmd, 0) + 1
+        rate = self._error_rate.get(cmd, 0.0)
+        self._error_rate[cmd] = rate - AdaptivePacer._ALPHA * rate
+
+        gap = self.gap(cmd) * AdaptivePacer._TIGHTEN
+        self._gap[cmd] = gap if gap >= 0.001 else 0.0
+
+    def failure(self, cmd: str, reason: str):
+        rate = self._error_rate.get(cmd, 0.0)
+        self._error_rate[cmd] = rate + AdaptivePacer._ALPHA * (1.0 - rate)
+
+        prev = self.gap(cmd)
+        self._gap[cmd] = gap = min(self._max_gap, max(prev * AdaptivePacer._BACKOFF, AdaptivePacer._MIN_BACKOFF))
+        # a timeout may just mean the learned timeout is too tight, start over
+        if reason == "timeout":
+            self._samples[cmd] = 0
+
+        if gap != prev:
+            _LOGGER.debug("%s %s, command gap %.3fs -> %.3fs", cmd, reason, prev, gap)
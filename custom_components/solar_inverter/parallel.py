@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorStateClass,
+)
+from homeassistant.const import (
+    UnitOfApparentPower,
+    UnitOfElectricCurrent,
+    UnitOfPower,
+    PERCENTAGE,
+)
+
+from .queries.metric import Metric
+from .queries.pi30 import qpgs, qpgs_key
+
+
+_MEASUREMENT = SensorStateClass.MEASUREMENT
+_W = (SensorDeviceClass.POWER, UnitOfPower.WATT, _MEASUREMENT)
+_A = (SensorDeviceClass.CURRENT, UnitOfElectricCurrent.AMPERE, _MEASUREMENT)
+
+_METRICS = (
+    Metric(-1, "parallel_units", "Parallel Units Online", None, None, _MEASUREMENT),
+    Metric(-1, "parallel_load_watt", "Parallel Load W", *_W),
+    Metric(-1, "parallel_load_va", "Parallel Load VA", SensorDeviceClass.APPARENT_POWER,
+           UnitOfApparentPower.VOLT_AMPERE, _MEASUREMENT),
+    Metric(-1, "parallel_pv_input_watt", "Parallel PV Input Power", *_W),
+    Metric(-1, "parallel_battery_charge_current", "Parallel Battery Charge Current", *_A),
+    Metric(-1, "parallel_battery_discharge_current", "Parallel Battery Discharge Current", *_A),
+    # spread of the unit loads around their mean, 0 is perfectly balanced
+    Metric(-1, "parallel_load_imbalance", "Parallel Load Imbalance", None, PERCENTAGE, _MEASUREMENT),
+    Metric(-1, "parallel_l1_load_watt", "Parallel L1 Load W", *_W),
+    Metric(-1, "parallel_l2_load_watt", "Parallel L2 Load W", *_W),
+    Metric(-1, "parallel_l3_load_watt", "Parallel L3 Load W", *_W),
+)
+
+# QPGS output mode state -> phase index
+_PHASES = {"Phase 1 of 3": 0, "Phase 2 of 3": 1, "Phase 3 of 3": 2}
+
+_UNIT_KEYS = (
+    "present", "output_mode", "load_watt", "load_va", "pv_input_voltage", "pv_input_current",
+    "battery_charge_current", "battery_discharge_current",
+)
+
+
+class ParallelGroup:
+    """Units of a parallel system, read from the host with QPGS0..QPGSn-1.
+
+    The hub sweeps all units in one go every cycle; aggregate() turns the
+    unit answers into group totals in one pass.
+    """
+
+    def __init__(self, units: int):
+        self._queries = tuple(qpgs(n) for n in range(units))
+        # key lookups per unit, compiled once
+        self._keys = tuple(
+            tuple(qpgs_key(n, k) for k in _UNIT_KEYS) for n in range(units)
+        )
+
+    @property
+    def queries(self) -> tuple:
+        return self._queries
+
+    def metrics(self) -> tuple[Metric, ...]:
+        return tuple(m for q in self._queries for m in q.metrics()) + _METRICS
+
+    def aggregate(self, units: list) -> dict:
+        online = 0
+        load_w = load_va = pv_w = charge = discharge = 0.0
+        loads = []
+        phases = [None, None, None]
+
+        for parsed, keys in zip(units, self._keys):
+            if not parsed:
+                continue
+            present, mode, w, va, pv_v, pv_a, chg, dis = (parsed.get(k) for k in keys)
+            if present != "present":
+                continue
+
+            online += 1
+            w = w or 0.0
+            load_w += w
+            load_va += va or 0.0
+            pv_w += (pv_v or 0.0) * (pv_a or 0.0)
+            charge += chg or 0.0
+            discharge += dis or 0.0
+            loads.append(w)
+
+            phase = _PHASES.get(mode)
+            if phase is not None:
+                phases[phase] = (phases[phase] or 0.0) + w
+
+        if not online:
+            return dict.fromkeys((m.uuid for m in _METRICS)) | {"parallel_units": 0}
+
+        mean = load_w / online
+        imbalance = round((max(loads) - min(loads)) / mean * 100, 1) if mean else 0.0
+
+        return {
+            "parallel_units": online,
+            "parallel_load_watt": load_w,
+            "parallel_load_va": load_va,
+            "parallel_pv_input_watt": round(pv_w, 1),
+            "parallel_battery_charge_current": charge,
+            "parallel_battery_discharge_current": discharge,
+            "parallel_load_imbalance": imbalance,
+            "parallel_l1_load_watt": phases[0],
+            "parallel_l2_load_watt": phases[1],
+            "parallel_l3_load_watt": phases[2],
+        }
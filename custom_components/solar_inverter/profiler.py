@@ -0,0 +1,114 @@
+"""cProfile (and optionally tracemalloc) over a number of poll cycles.
+
+Kept free of Home Assistant imports. The hub calls begin()/end() around
+each cycle; report() writes the files and belongs in an executor.
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+
+
+_TOP = 10
+
+# cProfile allows one active profiler per interpreter
+_active = None
+
+
+class CycleProfiler:
+    def __init__(self, name: str, cycles: int, trace_memory: bool = False):
+        global _active
+        if _active is not None:
+            raise RuntimeError(f"{_active.name} is being profiled already")
+        _active = self
+
+        self.name = name
+        self._left = cycles
+        self._cycles = cycles
+        self._profile = cProfile.Profile()
+        self._memory = trace_memory
+        self._started_tracing = False
+        self._snapshot = None
+        self._allocs = None
+        self._elapsed = 0.0
+        self._t0 = None
+
+    def begin(self):
+        if self._memory and self._snapshot is None:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+                self._started_tracing = True
+            self._snapshot = tracemalloc.take_snapshot()
+
+        self._t0 = time.perf_counter()
+        self._profile.enable()
+
+    def end(self) -> bool:
+        """Stop sampling this cycle, True once all cycles are in."""
+        self._profile.disable()
+        self._elapsed += time.perf_counter() - self._t0
+        self._left -= 1
+        return self._left <= 0
+
+    def finish(self):
+        global _active
+        _active = None
+
+        allocs = None
+        if self._snapshot is not None:
+            allocs = tracemalloc.take_snapshot().compare_to(self._snapshot, "lineno")
+            if self._started_tracing:
+                tracemalloc.stop()
+        self._allocs = allocs
+
+    def report(self, directory: str) -> dict:
+        """Write <name>-<time>.prof (for snakeviz & co) and .txt, return a short summary."""
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{self.name}-{time.strftime('%Y%m%d-%H%M%S')}")
+        self._profile.dump_stats(base + ".prof")
+
+        text = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=text)
+        text.write(f"{self.name}: {self._cycles} cycles, {self._elapsed * 1000:.1f} ms sampled\n\n")
+        stats.sort_stats("tottime").print_stats(40)
+        stats.sort_stats("cumulative").print_stats(40)
+
+        if self._allocs is not None:
+            text.write("Allocations since the first cycle\n")
+            for diff in self._allocs[:40]:
+                text.write(f"{diff}\n")
+
+        with open(base + ".txt", "w") as f:
+            f.write(text.getvalue())
+
+        # the loop waiting in epoll between device answers is idle, not cost
+        busy = [item for item in stats.stats.items() if "of 'select." not in item[0][2]]
+        top = sorted(busy, key=lambda item: item[1][2], reverse=True)[:_TOP]
+        summary = {
+            "cycles": self._cycles,
+            "sampled_ms": round(self._elapsed * 1000, 1),
+            "report": base + ".txt",
+            "time": [
+                {
+                    "function": f"{os.path.basename(file)}:{line}({func})",
+                    "calls": nc,
+                    "tottime_ms": round(tt * 1000, 3),
+                    "cumtime_ms": round(ct * 1000, 3),
+                }
+                for (file, line, func), (cc, nc, tt, ct, callers) in top
+            ],
+        }
+        if self._allocs is not None:
+            summary["alloc"] = [
+                {
+                    "where": str(diff.traceback[0]),
+                    "kib": round(diff.size_diff / 1024, 1),
+                    "count": diff.count_diff,
+                }
+                for diff in self._allocs[:_TOP]
+            ]
+        return summary
@@ -1,17 +1,21 @@
-from .qpigs import QPIGS
-from .qmod import QMOD
+from .pi30 import COMMANDS
 
 
-QUERIES = {
-    QPIGS.cmd(): QPIGS(),
-    QMOD.cmd(): QMOD()
-}
+QUERIES = {q.cmd(): q for q in COMMANDS}
+
+
+def query_name(user_q) -> str:
+    # plain "QPIGS" or {"query": "QPIGS", "interval": 2, ...}
+    if isinstance(user_q, dict):
+        return user_q["query"]
+    return user_q
 
 
 def get_user_queries(config):
     selected_queries = []
     for user_q in config:
-        if user_q in QUERIES:
-            selected_queries.append(QUERIES[user_q])
+        name = query_name(user_q)
+        if name in QUERIES:
+            selected_queries.append(QUERIES[name])
 
-    return selected_queries
\ No newline at end of file
+    return selected_queries
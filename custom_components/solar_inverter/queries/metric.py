@@ -6,11 +6,15 @@ from homeassistant.components.sensor import (
 )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Metric:
     ndx: int
     uuid: str
     name: str
     dc: SensorDeviceClass
     uom: str | None
-    sc: SensorStateClass | None
\ No newline at end of file
+    sc: SensorStateClass | None
+    # changes smaller than this are not published (0 publishes any change)
+    deadband: float = 0.0
+    # states of an ENUM sensor, bit names of a bitmask
+    options: tuple[str, ...] | None = None
\ No newline at end of file
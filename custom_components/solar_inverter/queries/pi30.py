@@ -0,0 +1,279 @@
+"""PI30 query tables, field layouts per docs/protocol.pdf.
+
+QPIGS2, QPGSn and the QET/QEY/QEM/QED energy counters come from the PI30
+MAX and parallel revisions of the protocol and are not in the pdf.
+"""
+from dataclasses import replace
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorStateClass,
+)
+
+from homeassistant.const import (
+    UnitOfElectricPotential,
+    UnitOfPower,
+    UnitOfElectricCurrent,
+    UnitOfEnergy,
+    UnitOfFrequency,
+    UnitOfApparentPower,
+    UnitOfTemperature,
+    UnitOfTime,
+    PERCENTAGE
+)
+
+from .table import Field, TableQuery, INT, ENUM, FLAG, MASK
+
+
+_MEASUREMENT = SensorStateClass.MEASUREMENT
+
+
+def _volt(ndx, uuid, name, sc=_MEASUREMENT, deadband=0.0):
+    return Field(ndx, uuid, name, SensorDeviceClass.VOLTAGE, UnitOfElectricPotential.VOLT, sc, deadband=deadband)
+
+
+def _amp(ndx, uuid, name, sc=_MEASUREMENT, deadband=0.0):
+    return Field(ndx, uuid, name, SensorDeviceClass.CURRENT, UnitOfElectricCurrent.AMPERE, sc, deadband=deadband)
+
+
+def _hz(ndx, uuid, name, sc=_MEASUREMENT, deadband=0.0):
+    return Field(ndx, uuid, name, SensorDeviceClass.FREQUENCY, UnitOfFrequency.HERTZ, sc, deadband=deadband)
+
+
+def _watt(ndx, uuid, name, sc=_MEASUREMENT, deadband=0.0):
+    return Field(ndx, uuid, name, SensorDeviceClass.POWER, UnitOfPower.WATT, sc, deadband=deadband)
+
+
+def _enum(ndx, uuid, name, options):
+    return Field(ndx, uuid, name, SensorDeviceClass.ENUM, kind=ENUM, options=options)
+
+
+def _onoff(ndx, uuid, name):
+    return _enum(ndx, uuid, name, _ON_OFF)
+
+
+def _flag(uuid, name, letter):
+    return Field(0, uuid, name, SensorDeviceClass.ENUM, kind=FLAG, options=letter)
+
+
+def _wh(uuid, name):
+    # counters are in Wh on the wire
+    return Field(0, uuid, name, SensorDeviceClass.ENERGY, UnitOfEnergy.KILO_WATT_HOUR,
+                 SensorStateClass.TOTAL_INCREASING, kind=INT, scale=0.001)
+
+
+_ON_OFF = {0: "disabled", 1: "enabled"}
+
+_BATTERY_TYPE = {0: "AGM", 1: "Flooded", 2: "User"}
+_INPUT_RANGE = {0: "Appliance", 1: "UPS"}
+_OUTPUT_PRIORITY = {0: "Utility first", 1: "Solar first", 2: "SBU first"}
+_CHARGER_PRIORITY = {0: "Utility first", 1: "Solar first", 2: "Solar + Utility", 3: "Only solar"}
+_MACHINE_TYPE = {0: "Grid tie", 1: "Off grid", 10: "Hybrid"}
+_TOPOLOGY = {0: "Transformerless", 1: "Transformer"}
+_OUTPUT_MODE = {
+    0: "Single", 1: "Parallel", 2: "Phase 1 of 3", 3: "Phase 2 of 3", 4: "Phase 3 of 3",
+}
+_PV_OK = {0: "Any unit", 1: "All units"}
+_PV_BALANCE = {0: "Max charge current", 1: "Charge + load power"}
+_OPERATION_LOGIC = {0: "Automatic", 1: "On-line", 2: "ECO"}
+
+# state names predate the table, keep them for existing automations
+_MODE = {
+    "P": "power on",
+    "S": "standby",
+    "L": "grid",
+    "B": "battery",
+    "F": "fault",
+    "H": "hybernate",
+    "D": "shutdown",
+    "C": "charge",
+    "Y": "bypass",
+    "E": "eco",
+}
+
+# QPIWS a0..a35, bit i of the warnings mask is a<i>
+WARNINGS = {
+    "pv_loss": "PV Loss",
+    "inverter_fault": "Inverter Fault",
+    "bus_over": "Bus Over",
+    "bus_under": "Bus Under",
+    "bus_soft_fail": "Bus Soft Fail",
+    "line_fail": "Line Fail",
+    "opv_short": "Output Short",
+    "inverter_voltage_low": "Inverter Voltage Too Low",
+    "inverter_voltage_high": "Inverter Voltage Too High",
+    "over_temperature": "Over Temperature",
+    "fan_locked": "Fan Locked",
+    "battery_voltage_high": "Battery Voltage High",
+    "battery_low": "Battery Low",
+    "reserved_13": "Reserved 13",
+    "battery_under_shutdown": "Battery Under Shutdown",
+    "battery_derating": "Battery Derating",
+    "over_load": "Over Load",
+    "eeprom_fault": "EEPROM Fault",
+    "inverter_over_current": "Inverter Over Current",
+    "inverter_soft_fail": "Inverter Soft Fail",
+    "self_test_fail": "Self Test Fail",
+    "op_dc_voltage_over": "Output DC Voltage Over",
+    "battery_open": "Battery Open",
+    "current_sensor_fail": "Current Sensor Fail",
+    "battery_short": "Battery Short",
+    "power_limit": "Power Limit",
+    "pv_voltage_high": "PV Voltage High",
+    "mppt_overload_fault": "MPPT Overload Fault",
+    "mppt_overload_warning": "MPPT Overload Warning",
+    "battery_too_low_to_charge": "Battery Too Low To Charge",
+    "dc_dc_over_current": "DC/DC Over Current",
+    "fault_code_31": "Fault Code 31",
+    "fault_code_32": "Fault Code 32",
+    "low_pv_energy": "Low PV Energy",
+    "high_ac_input_soft_start": "High AC Input During Soft Start",
+    "battery_equalization": "Battery Equalization",
+}
+
+
+# deadbands: the noisy voltages and frequencies wander by a digit or two
+# every poll, smaller moves than these are not written as states
+QPIGS = TableQuery("QPIGS", (
+    _volt(0, "grid_voltage", "Grid Voltage", deadband=1.0),
+    _hz(1, "grid_freq", "Grid Frequency", deadband=0.1),
+    _volt(2, "ac_output_voltage", "Output Voltage", deadband=1.0),
+    _hz(3, "ac_output_freq", "Output Frequency", deadband=0.1),
+    Field(4, "load_va", "Load VA", SensorDeviceClass.APPARENT_POWER, UnitOfApparentPower.VOLT_AMPERE, _MEASUREMENT),
+    _watt(5, "load_watt", "Load W"),
+    Field(6, "load_pcnt", "Load %", SensorDeviceClass.POWER_FACTOR, PERCENTAGE, _MEASUREMENT),
+    # BUS voltage per the pdf, the key is older than that finding
+    _volt(7, "pv_voltage", "PV Voltage", deadband=2.0),
+    _volt(8, "battery_voltage", "Battery Voltage", deadband=0.05),
+    _amp(9, "battery_charge_current", "Battery Charge Current"),
+    Field(10, "battery_level", "Battery Level", SensorDeviceClass.BATTERY, PERCENTAGE, _MEASUREMENT),
+    Field(11, "temperature", "Inverter Temperature", SensorDeviceClass.TEMPERATURE, UnitOfTemperature.CELSIUS, _MEASUREMENT),
+    _amp(12, "pv_input_current", "PV Input Current"),
+    _volt(13, "pv_input_voltage", "PV Input Voltage", deadband=2.0),
+    _amp(15, "battery_discharge_current", "Battery Discharge Current"),
+    _watt(19, "pv_input_watt", "PV Input Power"),
+))
+
+QPIGS2 = TableQuery("QPIGS2", (
+    _amp(0, "pv2_input_current", "PV2 Input Current"),
+    _volt(1, "pv2_input_voltage", "PV2 Input Voltage", deadband=2.0),
+    _watt(2, "pv2_input_watt", "PV2 Input Power"),
+))
+
+QMOD = TableQuery("QMOD", (
+    _enum(0, "mode", "Mode", _MODE),
+))
+
+QPIWS = TableQuery("QPIWS", (
+    Field(0, "warnings", "Warnings", kind=MASK, options=WARNINGS),
+))
+
+QPIRI = TableQuery("QPIRI", (
+    _volt(0, "grid_rating_voltage", "Grid Rating Voltage", sc=None),
+    _amp(1, "grid_rating_current", "Grid Rating Current", sc=None),
+    _volt(2, "ac_output_rating_voltage", "Output Rating Voltage", sc=None),
+    _hz(3, "ac_output_rating_freq", "Output Rating Frequency", sc=None),
+    _amp(4, "ac_output_rating_current", "Output Rating Current", sc=None),
+    Field(5, "ac_output_rating_va", "Output Rating VA", SensorDeviceClass.APPARENT_POWER, UnitOfApparentPower.VOLT_AMPERE),
+    _watt(6, "ac_output_rating_watt", "Output Rating W", sc=None),
+    _volt(7, "battery_rating_voltage", "Battery Rating Voltage", sc=None),
+    _volt(8, "battery_recharge_voltage", "Battery Re-charge Voltage", sc=None),
+    _volt(9, "battery_under_voltage", "Battery Under Voltage", sc=None),
+    _volt(10, "battery_bulk_voltage", "Battery Bulk Voltage", sc=None),
+    _volt(11, "battery_float_voltage", "Battery Float Voltage", sc=None),
+    _enum(12, "battery_type", "Battery Type", _BATTERY_TYPE),
+    _amp(13, "max_ac_charging_current", "Max AC Charging Current", sc=None),
+    _amp(14, "max_charging_current", "Max Charging Current", sc=None),
+    _enum(15, "input_voltage_range", "Input Voltage Range", _INPUT_RANGE),
+    _enum(16, "output_source_priority", "Output Source Priority", _OUTPUT_PRIORITY),
+    _enum(17, "charger_source_priority", "Charger Source Priority", _CHARGER_PRIORITY),
+    Field(18, "parallel_max_num", "Parallel Max Number", kind=INT),
+    _enum(19, "machine_type", "Machine Type", _MACHINE_TYPE),
+    _enum(20, "topology", "Topology", _TOPOLOGY),
+    _enum(21, "output_mode", "Output Mode", _OUTPUT_MODE),
+    _volt(22, "battery_redischarge_voltage", "Battery Re-discharge Voltage", sc=None),
+    _enum(23, "pv_ok_condition", "PV OK Condition", _PV_OK),
+    _enum(24, "pv_power_balance", "PV Power Balance", _PV_BALANCE),
+))
+
+QDI = TableQuery("QDI", (
+    _volt(0, "default_ac_output_voltage", "Default Output Voltage", sc=None),
+    _hz(1, "default_ac_output_freq", "Default Output Frequency", sc=None),
+    _amp(2, "default_max_ac_charging_current", "Default Max AC Charging Current", sc=None),
+    _volt(3, "default_battery_under_voltage", "Default Battery Under Voltage", sc=None),
+    _volt(4, "default_battery_float_voltage", "Default Battery Float Voltage", sc=None),
+    _volt(5, "default_battery_bulk_voltage", "Default Battery Bulk Voltage", sc=None),
+    _volt(6, "default_battery_recharge_voltage", "Default Battery Re-charge Voltage", sc=None),
+    _amp(7, "default_max_charging_current", "Default Max Charging Current", sc=None),
+    _enum(8, "default_input_voltage_range", "Default Input Voltage Range", _INPUT_RANGE),
+    _enum(9, "default_output_source_priority", "Default Output Source Priority", _OUTPUT_PRIORITY),
+    _enum(10, "default_charger_source_priority", "Default Charger Source Priority", _CHARGER_PRIORITY),
+    _enum(11, "default_battery_type", "Default Battery Type", _BATTERY_TYPE),
+    _onoff(12, "default_buzzer", "Default Buzzer"),
+    _onoff(13, "default_power_saving", "Default Power Saving"),
+    _onoff(14, "default_overload_restart", "Default Overload Restart"),
+    _onoff(15, "default_over_temperature_restart", "Default Over Temperature Restart"),
+    _onoff(16, "default_backlight", "Default Backlight"),
+    _onoff(17, "default_source_interrupt_alarm", "Default Source Interrupt Alarm"),
+    _onoff(18, "default_fault_code_record", "Default Fault Code Record"),
+    _onoff(19, "default_overload_bypass", "Default Overload Bypass"),
+    _onoff(20, "default_lcd_escape", "Default LCD Escape"),
+    _enum(21, "default_output_mode", "Default Output Mode", _OUTPUT_MODE),
+    _volt(22, "default_battery_redischarge_voltage", "Default Battery Re-discharge Voltage", sc=None),
+    _enum(23, "default_pv_ok_condition", "Default PV OK Condition", _PV_OK),
+    _enum(24, "default_pv_power_balance", "Default PV Power Balance", _PV_BALANCE),
+    Field(25, "default_max_cv_time", "Default Max CV Charging Time", SensorDeviceClass.DURATION, UnitOfTime.MINUTES, kind=INT),
+    _enum(26, "default_operation_logic", "Default Operation Logic", _OPERATION_LOGIC),
+))
+
+QFLAG = TableQuery("QFLAG", (
+    _flag("flag_buzzer", "Buzzer", "a"),
+    _flag("flag_overload_bypass", "Overload Bypass", "b"),
+    _flag("flag_power_saving", "Power Saving", "j"),
+    _flag("flag_lcd_escape", "LCD Escape", "k"),
+    _flag("flag_overload_restart", "Overload Restart", "u"),
+    _flag("flag_over_temperature_restart", "Over Temperature Restart", "v"),
+    _flag("flag_backlight", "Backlight", "x"),
+    _flag("flag_source_interrupt_alarm", "Source Interrupt Alarm", "y"),
+    _flag("flag_fault_code_record", "Fault Code Record", "z"),
+))
+
+QET = TableQuery("QET", (_wh("pv_generated_total", "PV Generated Total"),))
+QEY = TableQuery("QEY", (_wh("pv_generated_year", "PV Generated This Year"),), arg="%Y")
+QEM = TableQuery("QEM", (_wh("pv_generated_month", "PV Generated This Month"),), arg="%Y%m")
+QED = TableQuery("QED", (_wh("pv_generated_day", "PV Generated Today"),), arg="%Y%m%d")
+
+
+# QPGSn, unit n of a parallel system; declared once, keys prefixed per unit by qpgs()
+_QPGS = (
+    _enum(0, "present", "Present", {0: "absent", 1: "present"}),
+    _enum(2, "mode", "Mode", _MODE),
+    Field(3, "fault_code", "Fault Code", kind=INT),
+    _volt(4, "grid_voltage", "Grid Voltage"),
+    _hz(5, "grid_freq", "Grid Frequency"),
+    _volt(6, "ac_output_voltage", "Output Voltage"),
+    _hz(7, "ac_output_freq", "Output Frequency"),
+    Field(8, "load_va", "Load VA", SensorDeviceClass.APPARENT_POWER, UnitOfApparentPower.VOLT_AMPERE, _MEASUREMENT),
+    _watt(9, "load_watt", "Load W"),
+    Field(10, "load_pcnt", "Load %", SensorDeviceClass.POWER_FACTOR, PERCENTAGE, _MEASUREMENT),
+    _volt(11, "battery_voltage", "Battery Voltage"),
+    _amp(12, "battery_charge_current", "Battery Charge Current"),
+    Field(13, "battery_level", "Battery Level", SensorDeviceClass.BATTERY, PERCENTAGE, _MEASUREMENT),
+    _volt(14, "pv_input_voltage", "PV Input Voltage"),
+    _enum(20, "output_mode", "Output Mode", _OUTPUT_MODE),
+    _amp(25, "pv_input_current", "PV Input Current"),
+    _amp(26, "battery_discharge_current", "Battery Discharge Current"),
+)
+
+
+def qpgs_key(unit: int, key: str) -> str:
+    return f"p{unit}_{key}"
+
+
+def qpgs(unit: int) -> TableQuery:
+    return TableQuery(f"QPGS{unit}", tuple(
+        replace(f, uuid=qpgs_key(unit, f.uuid), name=f"Unit {unit} {f.name}") for f in _QPGS
+    ))
+
+
+COMMANDS = (QPIGS, QPIGS2, QMOD, QPIWS, QPIRI, QDI, QFLAG, QET, QEY, QEM, QED)
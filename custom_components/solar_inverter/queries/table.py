@@ -0,0 +1,181 @@
+"""Table driven PI30 queries.
+
+A command is declared once as a list of Fields. TableQuery compiles the
+declaration at import into the Metric descriptors the entities are built
+from and a parse plan: which tokens to pick and how to convert each one.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from operator import itemgetter
+
+from homeassistant.components.sensor import SensorDeviceClass
+
+from .metric import Metric
+
+
+# field kinds
+FLOAT = "float"
+INT = "int"
+TEXT = "text"
+ENUM = "enum"   # options: {code: state}, int codes when the token is a number
+FLAG = "flag"   # options: the QFLAG letter, state is "enabled"/"disabled"
+MASK = "mask"   # token of '0'/'1' chars, char i is bit i; options: bit names
+
+FLAG_STATES = ("disabled", "enabled")
+
+
+@dataclass(frozen=True, slots=True)
+class Field:
+    ndx: int
+    uuid: str
+    name: str
+    dc: SensorDeviceClass | None = None
+    uom: str | None = None
+    sc: str | None = None
+    kind: str = FLOAT
+    scale: float = 1.0
+    options: object = None
+    deadband: float = 0.0
+
+
+def _float(scale):
+    if scale == 1.0:
+        return float
+    return lambda tok: round(float(tok) * scale, 6)
+
+
+def _int(scale):
+    if scale == 1.0:
+        return int
+    return lambda tok: round(int(tok) * scale, 6)
+
+
+def _enum(options: dict):
+    if all(isinstance(code, int) for code in options):
+        return lambda tok: options.get(int(tok))
+    return lambda tok: options.get(tok.decode())
+
+
+def _flag(letter: str):
+    code = ord(letter.lower())
+
+    def flag(tok):
+        # "(EakxyDbjuvz": letters after E are enabled, after D disabled
+        enabled, _, disabled = tok.lower().partition(b"d")
+        if code in enabled[1:]:
+            return FLAG_STATES[1]
+        if code in disabled:
+            return FLAG_STATES[0]
+        return None
+    return flag
+
+
+def _mask(tok):
+    return int(tok[::-1], 2)
+
+
+def _converter(field: Field):
+    if field.kind == FLOAT:
+        return _float(field.scale)
+    if field.kind == INT:
+        return _int(field.scale)
+    if field.kind == TEXT:
+        return bytes.decode
+    if field.kind == ENUM:
+        return _enum(field.options)
+    if field.kind == FLAG:
+        return _flag(field.options)
+    if field.kind == MASK:
+        return _mask
+    raise ValueError(f"{field.uuid}: unknown field kind {field.kind!r}")
+
+
+def _options(field: Field) -> tuple[str, ...] | None:
+    if field.kind == ENUM:
+        return tuple(sorted(set(field.options.values())))
+    if field.kind == FLAG:
+        return FLAG_STATES
+    if field.kind == MASK:
+        return tuple(field.options)
+    return None
+
+
+def _safe(conv):
+    def convert(tok):
+        try:
+            return conv(tok)
+        except ValueError:
+            return None
+    return convert
+
+
+class TableQuery:
+    """One PI30 query compiled from its field table.
+
+    `arg` is a strftime format appended to the command when it is sent
+    (QEY2025, QEM202506), the query keeps its bare name everywhere else.
+    """
+
+    __slots__ = ("_cmd", "_arg", "_metrics", "_keys", "_ndx", "_pick",
+                 "_convs", "_safe", "_min_parts", "_floats")
+
+    def __init__(self, cmd: str, fields: tuple[Field, ...], arg: str | None = None):
+        self._cmd = cmd
+        self._arg = arg
+
+        self._metrics = tuple(
+            Metric(f.ndx, f.uuid, f.name, f.dc, f.uom, f.sc, f.deadband, _options(f))
+            for f in fields
+        )
+
+        # parse plan: field positions, output keys and converters in field order
+        self._keys = tuple(f.uuid for f in fields)
+        self._ndx = tuple(f.ndx for f in fields)
+        if len(fields) == 1:
+            n = self._ndx[0]
+            self._pick = lambda parts: (parts[n],)
+        else:
+            self._pick = itemgetter(*self._ndx)
+        self._convs = tuple(_converter(f) for f in fields)
+        self._safe = tuple(_safe(c) for c in self._convs)
+        self._min_parts = max(self._ndx) + 1
+        # plain readings go through map(float) in one go
+        self._floats = all(c is float for c in self._convs)
+
+    def cmd(self) -> str:
+        return self._cmd
+
+    @property
+    def dated(self) -> bool:
+        return self._arg is not None
+
+    def request(self, when=None) -> str:
+        """The command as sent to the device, dated `when` (a date) or now."""
+        if self._arg is None:
+            return self._cmd
+        if when is not None:
+            return self._cmd + when.strftime(self._arg)
+        return self._cmd + time.strftime(self._arg)
+
+    def metrics(self) -> tuple[Metric, ...]:
+        return self._metrics
+
+    def parse(self, body: bytes) -> dict:
+        parts = body.split()
+
+        if len(parts) >= self._min_parts:
+            values = self._pick(parts)
+            try:
+                if self._floats:
+                    return dict(zip(self._keys, map(float, values)))
+                return {k: c(v) for k, c, v in zip(self._keys, self._convs, values)}
+            except ValueError:
+                # a garbled field, fall back to per-field conversion
+                return {k: c(v) for k, c, v in zip(self._keys, self._safe, values)}
+
+        return {
+            k: (c(parts[n]) if n < len(parts) else None)
+            for k, c, n in zip(self._keys, self._safe, self._ndx)
+        }
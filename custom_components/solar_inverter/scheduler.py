@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PollScheduler:
+    """Shared by all inverter entries, caps how many devices are polled at once.
+
+    Every hub is still driven by its own coordinator, so polls of different
+    inverters overlap instead of queueing behind each other.
+    """
+
+    def __init__(self, max_concurrent: int):
+        self._max_concurrent = max_concurrent
+        self._sem = asyncio.Semaphore(max_concurrent)
+
+    @property
+    def max_concurrent(self) -> int:
+        return self._max_concurrent
+
+    async def async_poll(self, hub) -> dict:
+        async with self._sem:
+            return await hub.async_poll_all()
+
+    async def async_poll_many(self, hubs) -> list:
+        return await asyncio.gather(
+            *(self.async_poll(hub) for hub in hubs), return_exceptions=True
+        )
+
+
+@dataclass(slots=True)
+class ScheduledQuery:
+    query: object
+    interval: float
+    priority: int = 0
+    next_due: float = 0.0
+
+
+class QuerySchedule:
+    """Per-hub query tiers, decides which queries are sent in a poll slot.
+
+    Queries are due every `interval` seconds; within a slot lower `priority`
+    values are sent first. An interval of 0 means every slot.
+    """
+
+    # coordinator ticks are not exact, a query due this close is sent now
+    _JITTER = 0.1
+
+    def __init__(self, entries: list[ScheduledQuery]):
+        self._entries = sorted(entries, key=lambda e: e.priority)
+
+    @classmethod
+    def every_slot(cls, queries: list) -> QuerySchedule:
+        return cls([ScheduledQuery(q, 0) for q in queries])
+
+    @property
+    def entries(self) -> list[ScheduledQuery]:
+        return self._entries
+
+    @property
+    def tick(self) -> float | None:
+        """Slot length needed to serve the fastest query."""
+        intervals = [e.interval for e in self._entries if e.interval > 0]
+        return min(intervals) if intervals else None
+
+    def due(self, now: float) -> list[ScheduledQuery]:
+        due = []
+        for e in self._entries:
+            if now + QuerySchedule._JITTER < e.next_due:
+                continue
+
+            due.append(e)
+            # stay on the grid, unless we fell a whole interval behind
+            e.next_due = e.next_due + e.interval
+            if e.next_due <= now:
+                e.next_due = now + e.interval
+
+        return due
+
+    def retry(self, entry: ScheduledQuery, now: float):
+        """A failed query comes back in the next slot, not a full interval later."""
+        tick = self.tick
+        if tick is not None:
+            entry.next_due = min(entry.next_due, now + tick)
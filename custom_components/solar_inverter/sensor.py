@@ -1,8 +1,14 @@
 from __future__ import annotations
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.const import EntityCategory, UnitOfTime
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from .const import DOMAIN, CONF_QUERIES
 from .queries import metric
@@ -11,31 +17,70 @@ from .queries import metric
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, add: AddEntitiesCallback
 ) -> None:
-    data = hass.data[DOMAIN]
+    data = hass.data[DOMAIN][entry.entry_id]
     coordinator = data["coordinator"]
+    hub = data["hub"]
     user_queries = data[CONF_QUERIES]
 
     entities = []
    
     for q in user_queries:
         for metric in q.metrics():
-            sensor = None
+            if metric.dc is None and metric.options:
+                # bitmasks are split into binary sensors
+                continue
+            entities.append(HidInverterNumberSensor(coordinator, hub, entry.entry_id, metric.name, metric))
 
-            if metric.uuid == 'mode':
-                sensor = HidInverterModeSensor(coordinator, entry.entry_id, metric.name, metric)
-            else:
-                sensor = HidInverterNumberSensor(coordinator, entry.entry_id, metric.name, metric)
+    if hub.stream is not None:
+        for metric in hub.stream.metrics():
+            entities.append(HidInverterNumberSensor(coordinator, hub, entry.entry_id, metric.name, metric))
 
-            entities.append(sensor)
+    if hub.group is not None:
+        for metric in hub.group.metrics():
+            entities.append(HidInverterNumberSensor(coordinator, hub, entry.entry_id, metric.name, metric))
+
+    if hub.counters is not None:
+        for metric in hub.counters.metrics():
+            entities.append(HidInverterNumberSensor(coordinator, hub, entry.entry_id, metric.name, metric))
+
+    if hub.energy is not None:
+        for metric in hub.energy.metrics():
+            entities.append(HidInverterNumberSensor(coordinator, hub, entry.entry_id, metric.name, metric))
+
+    entities.append(HidInverterCycleSensor(coordinator, hub, entry.entry_id))
+    for q in user_queries:
+        entities.append(HidInverterLatencySensor(coordinator, hub, entry.entry_id, q.cmd()))
+
+    if hub.statistics is not None:
+        _disable_recorded(hass, entry.entry_id, hub.statistics.keys)
 
     add(entities)
 
 
+def _disable_recorded(hass: HomeAssistant, entry_id: str, keys):
+    """Disable the sensors statistics took over that were registered before it.
+
+    Disabled by default only applies to new registry entries. One still
+    carrying a state class has been recorded as states so far; once added
+    without one it is left alone, so enabling it again sticks.
+    """
+    registry = er.async_get(hass)
+    for key in keys:
+        entity_id = registry.async_get_entity_id("sensor", DOMAIN, f"{entry_id}-{key}")
+        if entity_id is None:
+            continue
+        ent = registry.async_get(entity_id)
+        if ent.disabled_by is None and (ent.capabilities or {}).get("state_class"):
+            registry.async_update_entity(entity_id, disabled_by=er.RegistryEntryDisabler.INTEGRATION)
+
+
 class _Base(CoordinatorEntity, SensorEntity):
-    def __init__(self, coordinator, entry_id : str, name: str, meta : metric.Metric):
+    def __init__(self, coordinator, hub, entry_id : str, name: str, meta : metric.Metric):
         super().__init__(coordinator)
 
+        self._hub = hub
         self._meta = meta
+        self._was_available = None
 
         self._attr_unique_id = f"{entry_id}-{meta.uuid}"
         self._attr_name = name
@@ -43,15 +88,38 @@ class _Base(CoordinatorEntity, SensorEntity):
         self._attr_device_class = meta.dc
         self._attr_native_unit_of_measurement = meta.uom
         self._attr_state_class = meta.sc
+        if hub.statistics is not None and meta.uuid in hub.statistics.keys:
+            # the hub imports hourly statistics, the state is only for watching it live
+            self._attr_state_class = None
+            self._attr_entity_registry_enabled_default = False
+        if meta.dc == SensorDeviceClass.ENUM:
+            self._attr_options = list(meta.options)
 
     @property
     def available(self) -> bool:
-        return bool(self.coordinator.data)
+        return super().available and bool(self.coordinator.data)
+
+    @property
+    def extra_state_attributes(self):
+        # restored from the last shutdown, the device has not answered yet
+        if self._hub.stale_since is not None:
+            return {"stale": True}
+        return None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # the hub reports which values changed, skip writing identical states
+        available = self.available
+        if available == self._was_available and self._meta.uuid not in self._hub.changed:
+            return
+
+        self._was_available = available
+        self.async_write_ha_state()
 
 
 class HidInverterNumberSensor(_Base):
-    def __init__(self, coordinator, entry_id : str, name: str, meta : metric.Metric):
-        super().__init__(coordinator, entry_id, name, meta)
+    def __init__(self, coordinator, hub, entry_id : str, name: str, meta : metric.Metric):
+        super().__init__(coordinator, hub, entry_id, name, meta)
 
     @property
     def native_value(self):
@@ -59,28 +127,76 @@ class HidInverterNumberSensor(_Base):
         return d.get(self._meta.uuid)
     
 
-class HidInverterModeSensor(_Base):
-    MODE_MAP = {
-        'P': 'power on',
-        'S': 'standby',
-        'L': 'grid',
-        'B': 'battery',
-        'F': 'fault',
-        'H': 'hybernate',
-        '' : 'unknown'
-    }
+class _Diagnostic(CoordinatorEntity, SensorEntity):
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 1
+
+    # counters change every cycle, keep them out of the recorder
+    _unrecorded_attributes = frozenset({"stats"})
+    # written every cycle, so recorded every cycle: enable the ones you want to watch
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, hub, entry_id : str, key: str, name: str):
+        super().__init__(coordinator)
+
+        self._hub = hub
+
+        self._attr_unique_id = f"{entry_id}-diag-{key}"
+        self._attr_name = name
+
+    @property
+    def available(self) -> bool:
+        # stays up while the device is down, that is when it is most useful
+        return True
 
-    MODE_OPTIONS = list(sorted(set(MODE_MAP.values())))
 
-    _attr_options = MODE_OPTIONS
+class HidInverterCycleSensor(_Diagnostic):
+    def __init__(self, coordinator, hub, entry_id : str):
+        super().__init__(coordinator, hub, entry_id, "cycle", "Poll Cycle")
 
-    def __init__(self, coordinator, entry_id : str, name: str, meta : metric.Metric):
-        super().__init__(coordinator, entry_id, name, meta)
+    @property
+    def native_value(self):
+        last = self._hub.stats.cycle_last
+        return None if last is None else round(last * 1000, 1)
+
+    @property
+    def extra_state_attributes(self):
+        stats = self._hub.stats
+        return {
+            "stats": {
+                "interval": stats.interval,
+                "cycles": stats.cycles,
+                "cycle_max_ms": round(stats.cycle_max * 1000, 1),
+                "overruns": stats.overruns,
+                "utilization": stats.utilization,
+                "errors": stats.error_total,
+                "link": self._hub.breaker.state,
+            }
+        }
+
+
+class HidInverterLatencySensor(_Diagnostic):
+    # one per command
+    def __init__(self, coordinator, hub, entry_id : str, cmd: str):
+        super().__init__(coordinator, hub, entry_id, f"latency-{cmd}", f"{cmd} Latency")
+        self._cmd = cmd
 
     @property
-    def native_value(self) -> str | None:
-        d = self.coordinator.data or {}
-        raw = d.get(self._meta.uuid)
-        if not raw:
+    def native_value(self):
+        stats = self._hub.stats.commands.get(self._cmd)
+        if stats is None or stats.latency_last is None:
             return None
-        return HidInverterModeSensor.MODE_MAP.get(raw, "unknown")
\ No newline at end of file
+        return round(stats.latency_last * 1000, 1)
+
+    @property
+    def extra_state_attributes(self):
+        stats = self._hub.stats.commands.get(self._cmd)
+        pacer = self._hub.pacer
+        return {
+            "stats": stats.as_dict() if stats else None,
+            "gap_ms": round(pacer.gap(self._cmd) * 1000, 1),
+            "error_rate": round(pacer.error_rate(self._cmd), 3),
+        }
\ No newline at end of file
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+
+# a failed refresh is tried again after this long, not every cycle (seconds)
+_RETRY = 60.0
+
+
+class StaticCache:
+    """Last answers of queries that only change with the settings (QPIRI, QDI).
+
+    A query is refreshed when it was never read since start, when its ttl
+    ran out, or after invalidate() (mode change, service call). Times are
+    wall clock, the cache outlives restarts through as_dict()/restore().
+    """
+
+    def __init__(self, ttls: dict):
+        # query -> ttl seconds
+        self._ttls = dict(ttls)
+        self._values = {q.cmd(): {} for q in self._ttls}
+        self._read_at = dict.fromkeys(self._values, 0.0)
+        # nothing read yet this run, refresh at startup even if restored
+        self._next = dict.fromkeys(self._values, 0.0)
+
+    @property
+    def queries(self) -> tuple:
+        return tuple(self._ttls)
+
+    def due(self, now: float) -> list:
+        return [q for q in self._ttls if now >= self._next[q.cmd()]]
+
+    def update(self, query, now: float, parsed: dict):
+        cmd = query.cmd()
+        self._values[cmd] = parsed
+        self._read_at[cmd] = now
+        self._next[cmd] = now + self._ttls[query]
+
+    def retry(self, query, now: float):
+        cmd = query.cmd()
+        self._next[cmd] = now + min(_RETRY, self._ttls[query])
+
+    def invalidate(self):
+        for cmd in self._next:
+            self._next[cmd] = 0.0
+
+    def values(self) -> dict:
+        out = {}
+        for values in self._values.values():
+            out |= values
+        return out
+
+    def ages(self, now: float) -> dict:
+        return {
+            cmd: (round(now - t, 1) if t else None)
+            for cmd, t in self._read_at.items()
+        }
+
+    def as_dict(self) -> dict:
+        return {
+            cmd: {"read_at": self._read_at[cmd], "values": values}
+            for cmd, values in self._values.items()
+            if values
+        }
+
+    def restore(self, data: dict | None):
+        for cmd, item in (data or {}).items():
+            if cmd in self._values:
+                self._values[cmd] = dict(item.get("values") or {})
+                self._read_at[cmd] = float(item.get("read_at") or 0.0)
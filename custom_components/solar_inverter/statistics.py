@@ -0,0 +1,110 @@
+"""Hourly mean/min/max and energy sums of fast metrics.
+
+The hub feeds every poll in; each closed hour comes out of take() once,
+ready for the recorder's external statistics import, so the metrics need
+no recorded states. Kept free of Home Assistant imports.
+"""
+from __future__ import annotations
+
+
+_HOUR = 3600
+
+
+class HourlyStatistics:
+    def __init__(self, means, sums=()):
+        # metrics with a mean/min/max per hour, counters with a running sum
+        self._means = tuple(means)
+        self._sums = tuple(sums)
+        self._mean_keys = tuple(m.uuid for m in self._means)
+        self._sum_keys = tuple(m.uuid for m in self._sums)
+
+        self._hour: float | None = None
+        # key -> [samples, total, min, max] of the current hour
+        self._acc: dict[str, list] = {}
+        self._last: dict[str, float] = {}
+        self._closed: list[tuple] = []
+
+    @property
+    def means(self) -> tuple:
+        return self._means
+
+    @property
+    def sums(self) -> tuple:
+        return self._sums
+
+    @property
+    def keys(self) -> frozenset[str]:
+        return frozenset(self._mean_keys + self._sum_keys)
+
+    @property
+    def pending(self) -> int:
+        return len(self._closed)
+
+    def add(self, t: float, data: dict, window: dict | None = None):
+        """One poll. With streaming, `window` is the stream window behind `data`:
+        its samples weigh the mean and its own min/max keep the spikes."""
+        hour = t - t % _HOUR
+        if hour != self._hour:
+            if self._hour is not None:
+                self._close()
+            self._hour = hour
+
+        if window is None:
+            self._add_means(data, 1, "", "")
+        elif window:
+            # an empty window has no new samples, data still holds the last one
+            self._add_means(window, window["stream_samples"], "_min", "_max")
+
+        for key in self._sum_keys:
+            v = data.get(key)
+            if v is not None:
+                self._last[key] = v
+
+    def _add_means(self, data: dict, n: int, lo_suffix: str, hi_suffix: str):
+        acc = self._acc
+        for key in self._mean_keys:
+            v = data.get(key)
+            if v is None:
+                continue
+            lo = data[key + lo_suffix]
+            hi = data[key + hi_suffix]
+            a = acc.get(key)
+            if a is None:
+                acc[key] = [n, v * n, lo, hi]
+                continue
+            a[0] += n
+            a[1] += v * n
+            if lo < a[2]:
+                a[2] = lo
+            if hi > a[3]:
+                a[3] = hi
+
+    def _close(self):
+        means = {
+            key: (round(total / n, 3), lo, hi) for key, (n, total, lo, hi) in self._acc.items()
+        }
+        self._closed.append((self._hour, means, dict(self._last)))
+        self._acc = {}
+
+    def take(self) -> list[tuple]:
+        """Closed hours as (start, {key: (mean, min, max)}, {key: counter}), oldest first.
+
+        The hour in progress stays until a sample of the next one arrives.
+        """
+        rows = self._closed
+        self._closed = []
+        return rows
+
+    def as_dict(self) -> dict:
+        """The hour in progress and the closed hours not taken yet, to survive a restart."""
+        return {"hour": self._hour, "acc": self._acc, "last": self._last, "closed": self._closed}
+
+    def restore(self, data: dict | None):
+        if not data:
+            return
+        keys = self.keys
+        self._hour = data.get("hour")
+        self._acc = {k: list(a) for k, a in (data.get("acc") or {}).items() if k in keys}
+        self._last = {k: float(v) for k, v in (data.get("last") or {}).items() if k in keys}
+        # a restored hour already over is closed by the next add()
+        self._closed = [tuple(row) for row in data.get("closed") or ()] + self._closed
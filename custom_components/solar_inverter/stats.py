@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+
+
+# upper bounds of the latency histogram buckets, seconds (last one catches the rest)
+LATENCY_BUCKETS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, float("inf"))
+
+# deadline: cut short by the cycle budget rather than the device
+ERROR_KINDS = ("timeout", "crc", "nak", "error", "deadline")
+
+
+class CommandStats:
+    __slots__ = ("count", "errors", "bytes_tx", "bytes_rx", "latency_sum", "latency_last", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = dict.fromkeys(ERROR_KINDS, 0)
+        self.bytes_tx = 0
+        self.bytes_rx = 0
+        self.latency_sum = 0.0
+        self.latency_last = None
+        self.histogram = [0] * len(LATENCY_BUCKETS)
+
+    @property
+    def latency_mean(self) -> float | None:
+        return self.latency_sum / self.count if self.count else None
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": dict(self.errors),
+            "bytes_tx": self.bytes_tx,
+            "bytes_rx": self.bytes_rx,
+            "latency_last": self.latency_last,
+            "latency_mean": self.latency_mean,
+            "histogram": {
+                ("inf" if b == float("inf") else str(b)): n
+                for b, n in zip(LATENCY_BUCKETS, self.histogram)
+            },
+        }
+
+
+class PollStats:
+    """Counters of one hub: per-command latency/bytes/errors and cycle timing."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.commands: dict[str, CommandStats] = {}
+
+        self.cycles = 0
+        self.cycle_last = None
+        self.cycle_max = 0.0
+        self.overruns = 0
+
+    def _cmd(self, cmd: str) -> CommandStats:
+        stats = self.commands.get(cmd)
+        if stats is None:
+            stats = self.commands[cmd] = CommandStats()
+        return stats
+
+    def exchange(self, cmd: str, latency: float, tx: int, rx: int):
+        stats = self._cmd(cmd)
+        stats.count += 1
+        stats.bytes_tx += tx
+        stats.bytes_rx += rx
+        stats.latency_sum += latency
+        stats.latency_last = latency
+        stats.histogram[bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    def error(self, cmd: str, kind: str):
+        self._cmd(cmd).errors[kind] += 1
+
+    def cycle(self, duration: float):
+        self.cycles += 1
+        self.cycle_last = duration
+        self.cycle_max = max(self.cycle_max, duration)
+        if duration > self.interval:
+            self.overruns += 1
+
+    @property
+    def error_total(self) -> int:
+        return sum(sum(s.errors.values()) for s in self.commands.values())
+
+    @property
+    def utilization(self) -> float | None:
+        """Last cycle duration as a share of the poll interval, %."""
+        if self.cycle_last is None:
+            return None
+        return 100.0 * self.cycle_last / self.interval
+
+    def as_dict(self) -> dict:
+        return {
+            "interval": self.interval,
+            "cycles": self.cycles,
+            "cycle_last": self.cycle_last,
+            "cycle_max": self.cycle_max,
+            "overruns": self.overruns,
+            "commands": {cmd: s.as_dict() for cmd, s in self.commands.items()},
+        }
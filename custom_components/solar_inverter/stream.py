@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import replace
+
+from .queries.metric import Metric
+
+
+_NAN = float("nan")
+
+
+class RingBuffer:
+    """Fixed-size float ring, preallocated; a missing reading is stored as NaN."""
+
+    __slots__ = ("_buf", "_size", "_pos", "_count")
+
+    def __init__(self, size: int):
+        self._buf = array("d", bytes(8 * size))
+        self._size = size
+        self._pos = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, value: float):
+        self._buf[self._pos] = value
+        self._pos = (self._pos + 1) % self._size
+        if self._count < self._size:
+            self._count += 1
+
+    def latest(self, n: int) -> array:
+        """The newest n values, oldest first."""
+        n = min(n, self._count)
+        start = (self._pos - n) % self._size
+        if start + n <= self._size:
+            return self._buf[start:start + n]
+        return self._buf[start:] + self._buf[:self._pos]
+
+
+class MetricStream:
+    """High-rate samples of one query, published as windowed aggregates.
+
+    Every sample goes into a ring buffer per metric. window() folds the
+    samples taken since the previous call into mean (the metric itself),
+    min and max, so entities and the recorder only see one value per
+    poll interval.
+    """
+
+    def __init__(self, query, size: int):
+        self._query = query
+        self._keys = tuple(m.uuid for m in query.metrics())
+        self._rings = {k: RingBuffer(size) for k in self._keys}
+        self._times = RingBuffer(size)
+        self._pending = 0
+        self._size = size
+
+        self._metrics = tuple(
+            replace(m, uuid=f"{m.uuid}_{agg}", name=f"{m.name} {agg.capitalize()}")
+            for m in query.metrics()
+            for agg in ("min", "max")
+        )
+
+    @property
+    def query(self):
+        return self._query
+
+    @property
+    def times(self) -> RingBuffer:
+        return self._times
+
+    def ring(self, key: str) -> RingBuffer:
+        return self._rings[key]
+
+    def metrics(self) -> tuple[Metric, ...]:
+        """Extra min/max metrics published next to the streamed ones."""
+        return self._metrics
+
+    def add(self, t: float, parsed: dict):
+        self._times.append(t)
+        for key in self._keys:
+            v = parsed.get(key)
+            self._rings[key].append(_NAN if v is None else v)
+        self._pending += 1
+
+    def window(self) -> dict:
+        n = min(self._pending, self._size)
+        if not n:
+            return {}
+        self._pending = 0
+
+        out = {"stream_samples": n}
+        for key in self._keys:
+            values = [v for v in self._rings[key].latest(n) if v == v]
+            if values:
+                out[key] = round(sum(values) / len(values), 3)
+                out[f"{key}_min"] = min(values)
+                out[f"{key}_max"] = max(values)
+            else:
+                out[key] = out[f"{key}_min"] = out[f"{key}_max"] = None
+
+        return out
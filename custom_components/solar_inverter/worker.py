@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+
+
+# lower is served first
+CONTROL = 0       # setters, they change the inverter state
+INTERACTIVE = 1   # on-demand reads from services
+POLL = 2          # the poll cycle and the stream
+
+
+class _Request:
+    __slots__ = ("cmd", "timeout", "priority", "fut", "sent")
+
+    def __init__(self, cmd: str, timeout: float, priority: int, fut: asyncio.Future):
+        self.cmd = cmd
+        self.timeout = timeout
+        self.priority = priority
+        self.fut = fut
+        self.sent = False
+
+
+class DeviceWorker:
+    """The only task talking to a device.
+
+    Callers queue commands with a priority; one request is on the wire at a
+    time, so the device never sees interleaved frames. A query already
+    queued or on the wire is not sent again, later callers share its
+    answer. While it is still queued it moves up to the most urgent
+    priority and the longest timeout of its callers; once on the wire it
+    finishes with the timeout it was sent with. Setters are always sent,
+    in order.
+    """
+
+    def __init__(self, device, name: str):
+        self._dev = device
+        self._name = name
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._inflight: dict[str, _Request] = {}
+        self._task: asyncio.Task | None = None
+        # copies left behind in the queue by requests that moved up
+        self._moved = 0
+
+        self.coalesced = 0
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() - self._moved
+
+    async def request(self, cmd: str, timeout: float, priority: int = POLL) -> tuple[bytes, float]:
+        """Answer frame and the time the device took for it (queueing not counted)."""
+        loop = asyncio.get_running_loop()
+        self._ensure_running(loop)
+
+        is_query = cmd.startswith("Q")
+        req = self._inflight.get(cmd) if is_query else None
+        if req is not None:
+            self.coalesced += 1
+            if not req.sent:
+                req.timeout = max(req.timeout, timeout)
+                if priority < req.priority:
+                    # queued again ahead, the copy left behind is skipped
+                    req.priority = priority
+                    self._moved += 1
+                    self._queue.put_nowait((priority, next(self._seq), req))
+        else:
+            req = _Request(cmd, timeout, priority, loop.create_future())
+            if is_query:
+                self._inflight[cmd] = req
+            self._queue.put_nowait((priority, next(self._seq), req))
+
+        # shielded, one caller giving up must not cancel the others' answer
+        return await asyncio.shield(req.fut)
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        while not self._queue.empty():
+            *_, req = self._queue.get_nowait()
+            fut = req.fut
+            if not fut.done():
+                fut.set_exception(ConnectionError(f"{self._name}: closed"))
+                fut.exception()
+        self._inflight.clear()
+        self._moved = 0
+
+        self._dev.close()
+
+    def _ensure_running(self, loop):
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run(), name=f"{self._name} device worker")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, req = await self._queue.get()
+            if req.sent:
+                # an earlier copy of a request moved up the queue
+                self._moved -= 1
+                continue
+            req.sent = True
+            cmd, fut = req.cmd, req.fut
+            try:
+                started = loop.time()
+                raw = await self._dev.query(cmd, timeout=req.timeout)
+            except asyncio.CancelledError:
+                if not fut.done():
+                    fut.cancel()
+                raise
+            except Exception as e:
+                if not fut.done():
+                    fut.set_exception(e)
+                    fut.exception()  # retrieved, the caller may be gone
+            else:
+                if not fut.done():
+                    fut.set_result((raw, loop.time() - started))
+            finally:
+                if self._inflight.get(cmd) is req:
+                    del self._inflight[cmd]
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# Headless benchmark of the codec, parsers and poll cycle.
+# Needs homeassistant importable (devcontainer), but not running.
+#
+# > test/bench.py --out bench_output.json
+# > test/bench.py --latency 0.05 --jitter 0.02 --devices 1,4,16,32
+#
+# Results go to stdout (or --out) as JSON, so runs from different commits can be diffed.
+import os, sys, json, time, asyncio, argparse, platform, subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from custom_components.solar_inverter import codec  # noqa: E402
+from custom_components.solar_inverter.hub import InverterHub, _strip_frame  # noqa: E402
+from custom_components.solar_inverter.queries import QUERIES  # noqa: E402
+from custom_components.solar_inverter.scheduler import PollScheduler  # noqa: E402
+from custom_components.solar_inverter.devices.fake import FakeDevice  # noqa: E402
+
+
+# the poll cycle benchmark keeps to the original query set, so runs stay comparable
+CYCLE_QUERIES = ("QPIGS", "QMOD")
+
+
+def rate(fn, min_time: float) -> float:
+    """Calls per second of fn, measured for at least min_time seconds."""
+    n = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn()
+        dt = time.perf_counter() - t0
+        if dt >= min_time:
+            return n / dt
+        n *= 2 if dt < min_time / 4 else max(2, int(min_time / dt) + 1)
+
+
+def load_frames(path: str) -> dict:
+    with open(path) as f:
+        frames = {s["cmd"]: bytes.fromhex(s["rx_hex"]) for s in json.load(f)}
+    # samples.json has no QMOD capture, build a valid one
+    body = b"(B"
+    crc = codec.calc_crc(body)
+    frames.setdefault("QMOD", body + bytes([crc >> 8, crc & 0xFF, 0x0D]))
+    return frames
+
+
+def bench_codec(frames: dict, min_time: float) -> dict:
+    qpigs = frames["QPIGS"]
+    crc_rate = rate(lambda: codec.calc_crc(qpigs), min_time)
+
+    return {
+        "crc_frames_per_s": crc_rate,
+        "crc_mb_per_s": crc_rate * len(qpigs) / 1e6,
+        "check_crc_per_s": rate(lambda: codec.check_crc(qpigs), min_time),
+        "encode_static_per_s": rate(lambda: codec.encode("QPIGS"), min_time),
+        "encode_dynamic_per_s": rate(lambda: codec.encode("PCP03"), min_time),
+        "strip_frame_per_s": rate(lambda: _strip_frame(qpigs), min_time),
+    }
+
+
+def bench_parse(frames: dict, min_time: float) -> dict:
+    out = {}
+    for cmd, query in QUERIES.items():
+        raw = frames.get(cmd)
+        if raw is None:
+            continue
+        out[cmd] = rate(lambda: query.parse(_strip_frame(raw)), min_time)
+    return out
+
+
+def make_hub(i: int, latency: float, jitter: float) -> InverterHub:
+    return InverterHub(
+        None, "fake", name=f"bench{i}", queries=[QUERIES[c] for c in CYCLE_QUERIES],
+        device=FakeDevice(latency=latency, jitter=jitter),
+    )
+
+
+async def bench_cycle(latency: float, jitter: float, cycles: int) -> dict:
+    hub = make_hub(0, latency, jitter)
+    durations = []
+    try:
+        for _ in range(cycles):
+            t0 = time.perf_counter()
+            await hub.async_poll_all()
+            durations.append(time.perf_counter() - t0)
+    finally:
+        # stops the device worker task
+        await hub.async_close()
+
+    durations.sort()
+    return {
+        "cycles_per_s": len(durations) / sum(durations),
+        "cycle_p50_s": durations[len(durations) // 2],
+        "cycle_p95_s": durations[int(len(durations) * 0.95) - 1],
+        "final_gap_s": {q.cmd(): hub.pacer.gap(q.cmd()) for q in hub.queries},
+    }
+
+
+async def bench_scaling(counts: list, latency: float, jitter: float,
+                        max_concurrent: int, cycles: int) -> list:
+    curve = []
+    for count in counts:
+        hubs = [make_hub(i, latency, jitter) for i in range(count)]
+        scheduler = PollScheduler(max_concurrent or count)
+
+        t0 = time.perf_counter()
+        try:
+            for _ in range(cycles):
+                await scheduler.async_poll_many(hubs)
+            dt = (time.perf_counter() - t0) / cycles
+        finally:
+            for hub in hubs:
+                await hub.async_close()
+
+        curve.append({"devices": count, "fleet_cycle_s": dt, "per_device_s": dt / count})
+    return curve
+
+
+def git_rev() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--samples", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples.json"))
+    ap.add_argument("--min-time", type=float, default=0.5, help="seconds per micro benchmark")
+    ap.add_argument("--latency", type=float, default=0.0, help="fake device turnaround, seconds")
+    ap.add_argument("--jitter", type=float, default=0.0, help="extra random turnaround, seconds")
+    ap.add_argument("--cycles", type=int, default=20)
+    ap.add_argument("--devices", default="1,2,4,8,16,32", help="fleet sizes for the scaling curve")
+    ap.add_argument("--max-concurrent", type=int, default=0, help="poll cap, 0 polls the whole fleet at once")
+    ap.add_argument("--out")
+    args = ap.parse_args()
+
+    frames = load_frames(args.samples)
+    counts = [int(c) for c in args.devices.split(",") if c.strip()]
+
+    result = {
+        "rev": git_rev(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "params": vars(args),
+        "codec": bench_codec(frames, args.min_time),
+        "parse_per_s": bench_parse(frames, args.min_time),
+        "cycle": asyncio.run(bench_cycle(args.latency, args.jitter, args.cycles)),
+        "scaling": asyncio.run(bench_scaling(
+            counts, args.latency, args.jitter, args.max_concurrent, max(1, args.cycles // 4)
+        )),
+    }
+
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
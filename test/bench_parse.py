@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# Compares the compiled query parsers against the old decode/split/rebuild-metrics path.
+# Needs homeassistant importable (devcontainer), but not running.
+import os, sys, json, timeit, argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from custom_components.solar_inverter.queries import QUERIES  # noqa: E402
+from custom_components.solar_inverter.queries.metric import Metric  # noqa: E402
+
+
+def legacy_parse(query, raw: bytes) -> dict:
+    # what hub._parse + QPIGS.parse did before: decode, split, rebuild Metric list per call
+    parts = raw[1:-3].decode().split()
+
+    def f(i):
+        try:
+            return float(parts[i])
+        except Exception:
+            return None
+
+    metrics = [Metric(m.ndx, m.uuid, m.name, m.dc, m.uom, m.sc) for m in query.metrics()]
+    return {m.uuid: f(m.ndx) for m in metrics}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--samples", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples.json"))
+    ap.add_argument("--number", type=int, default=100000)
+    args = ap.parse_args()
+
+    with open(args.samples) as f:
+        frames = {s["cmd"]: bytes.fromhex(s["rx_hex"]) for s in json.load(f)}
+
+    # only QPIGS had a hand-written parser to compare against
+    for cmd in ("QPIGS",):
+        query = QUERIES[cmd]
+        raw = frames[cmd]
+
+        assert legacy_parse(query, raw) == query.parse(raw[1:-3]), cmd
+
+        old = timeit.timeit(lambda: legacy_parse(query, raw), number=args.number)
+        new = timeit.timeit(lambda: query.parse(raw[1:-3]), number=args.number)
+        print(f"{cmd:6} legacy {old / args.number * 1e6:7.2f} us  compiled {new / args.number * 1e6:7.2f} us  x{old / new:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# Backfill check of the device energy counters: polls a fake inverter that
+# NAKs days older than --nak-days and checks every closed period is asked
+# for exactly once, the refused ones cached as unavailable.
+# Needs homeassistant importable (devcontainer), but not running.
+#
+# > test/counters_check.py    # exits 1 on any failure
+import os, sys, asyncio, argparse
+from collections import Counter
+from datetime import timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+from custom_components.solar_inverter import hub as hub_mod  # noqa: E402
+from custom_components.solar_inverter.hub import InverterHub  # noqa: E402
+from custom_components.solar_inverter.counters import EnergyCounters  # noqa: E402
+from custom_components.solar_inverter.queries import QUERIES  # noqa: E402
+from custom_components.solar_inverter.devices.fake import FakeDevice  # noqa: E402
+
+
+class RefusingDevice(FakeDevice):
+    """Fake inverter without day records before `oldest` (a YYYYMMDD string)."""
+
+    def __init__(self, oldest: str):
+        super().__init__()
+        self.oldest = oldest
+        self.sent = Counter()
+
+    async def query(self, cmd: str, timeout: float | None = None) -> bytes:
+        self.sent[cmd] += 1
+        if cmd.startswith("QED") and len(cmd) == 11 and cmd[3:] < self.oldest:
+            return FakeDevice._NAK
+        return await super().query(cmd, timeout)
+
+
+async def run(days: int, months: int, years: int, nak_days: int) -> list[str]:
+    # no pause between backfill reads, one per cycle
+    hub_mod._BACKFILL_GAP = 0
+
+    counters = EnergyCounters(days=days, months=months, years=years)
+    dev = RefusingDevice("")
+    hub = InverterHub(None, "fake", "check", [QUERIES["QPIGS"]], device=dev, interval=5,
+                      counters=counters)
+    today = dt_util.now().date()
+    dev.oldest = (today - timedelta(days=nak_days)).strftime("%Y%m%d")
+
+    errors = []
+    try:
+        for _ in range(days + months + years + 5):
+            await hub.async_poll_all()
+    finally:
+        await hub.async_close()
+
+    if counters.missing(today) is not None:
+        errors.append(f"still missing after the backfill: {counters.missing(today)}")
+
+    cached = counters.as_dict()
+    refused = [k for k, v in cached["days"].items() if v is None]
+    if len(refused) != days - nak_days:
+        errors.append(f"{len(refused)} days cached as unavailable, expected {days - nak_days}")
+    if len(cached["months"]) != months or len(cached["years"]) != years:
+        errors.append(f"months/years not all read: {cached}")
+
+    # the current day, month and year are live readings, read again on purpose
+    live = {today.strftime("QED%Y%m%d"), today.strftime("QEM%Y%m"), today.strftime("QEY%Y")}
+    repeated = {cmd: n for cmd, n in dev.sent.items()
+                if n > 1 and cmd[:3] in ("QED", "QEM", "QEY") and cmd not in live}
+    if repeated:
+        errors.append(f"closed periods read more than once: {repeated}")
+    return errors
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--days", type=int, default=10)
+    ap.add_argument("--months", type=int, default=3)
+    ap.add_argument("--years", type=int, default=2)
+    ap.add_argument("--nak-days", type=int, default=4, help="days back the device still has records for")
+    args = ap.parse_args()
+
+    errors = asyncio.run(run(args.days, args.months, args.years, args.nak_days))
+    for e in errors:
+        print(e)
+    print("FAIL" if errors else "OK")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# Golden check of the query tables: parses every frame in samples.json (real
+# captures) and golden_frames.json (hand-built frames for the commands without
+# a capture) and compares the result with golden.json.
+# Needs homeassistant importable (devcontainer), but not running.
+#
+# > test/golden.py            # exits 1 on any difference
+# > test/golden.py --update   # after a deliberate table change, review the diff
+import os, sys, json, argparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from custom_components.solar_inverter import codec  # noqa: E402
+from custom_components.solar_inverter.queries import QUERIES  # noqa: E402
+from custom_components.solar_inverter.queries.pi30 import qpgs  # noqa: E402
+
+
+def find_query(cmd: str):
+    if cmd.startswith("QPGS"):
+        # one table per parallel unit, QPGS0..QPGS9
+        return qpgs(int(cmd[4:]))
+    return QUERIES.get(cmd)
+
+
+def parse_samples(path: str) -> dict:
+    with open(path) as f:
+        samples = json.load(f)
+
+    out = {}
+    for s in samples:
+        query = find_query(s["cmd"])
+        if query is None:
+            continue
+        raw = bytes.fromhex(s["rx_hex"])
+        assert codec.check_crc(raw), f"{s['cmd']}: bad CRC in the sample"
+        out[s["cmd"]] = query.parse(raw[1:-3])
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--samples", default=os.path.join(HERE, "samples.json"))
+    ap.add_argument("--frames", default=os.path.join(HERE, "golden_frames.json"))
+    ap.add_argument("--golden", default=os.path.join(HERE, "golden.json"))
+    ap.add_argument("--update", action="store_true", help="rewrite golden.json from the current tables")
+    args = ap.parse_args()
+
+    # a real capture wins over a hand-built frame of the same command
+    parsed = parse_samples(args.frames) | parse_samples(args.samples)
+
+    if args.update:
+        with open(args.golden, "w") as f:
+            json.dump(parsed, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {len(parsed)} commands to {args.golden}")
+        return
+
+    with open(args.golden) as f:
+        golden = json.load(f)
+
+    failed = 0
+    for cmd in sorted(set(golden) | set(parsed)):
+        want, got = golden.get(cmd), parsed.get(cmd)
+        if want == got:
+            print(f"{cmd:6} ok")
+            continue
+
+        failed += 1
+        print(f"{cmd:6} FAILED")
+        for key in sorted(set(want or {}) | set(got or {})):
+            w, g = (want or {}).get(key, "<missing>"), (got or {}).get(key, "<missing>")
+            if w != g:
+                print(f"    {key}: expected {w!r}, got {g!r}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,9 @@
 #!/usr/bin/env python3
 import os, fcntl, json, time, argparse, select, sys
 
-_TA = [
-    0x0000,0x1021,0x2042,0x3063,0x4084,0x50a5,0x60c6,0x70e7,
-    0x8108,0x9129,0xa14a,0xb16b,0xc18c,0xd1ad,0xe1ce,0xf1ef
-]
-
-_FORBIDDEN_BYTES = [ 0x0A, 0x0D, 0x28 ]
-
-def calc_crc(data):
-    crc = 0
-
-    for i in range(len(data)):
-        da=((crc>>8) & 0xFF) >> 4
-        crc = (crc << 4) & 0xFFFF
-        index = da ^ (data[i] >> 4)
-        mask = _TA[index]
-        crc = crc ^ mask
-
-        da=((crc>>8) & 0xFF) >> 4
-        crc = (crc << 4) & 0xFFFF
-        index = da ^ (data[i] & 0x0F)
-        mask = _TA[index]
-        crc = crc ^ mask
-
-    if (crc & 0xFF) in _FORBIDDEN_BYTES:
-        crc = crc + 0x01
-    if (crc >> 8) in _FORBIDDEN_BYTES:
-        crc = crc + 0x100
-
-    return crc
-
-
-def build_cmd(cmd: str) -> bytes:
-    payload = bytearray(cmd.encode('utf-8'))
-    crc = calc_crc(payload)
-    payload.append((crc >> 8) & 0xFF)
-    payload.append(crc & 0xFF)
-    payload.append(0x0D)
-    return payload
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "custom_components", "solar_inverter"))
+from codec import encode as build_cmd  # noqa: E402
+from capture import CaptureWriter  # noqa: E402
 
 
 def read_until_cr(fd: int, timeout: float = 2.0) -> bytes:
@@ -67,11 +32,38 @@ def read_until_cr(fd: int, timeout: float = 2.0) -> bytes:
         if chunk:
             buf.extend(chunk)
 
+def capture(fd: int, cmds: list, path: str, interval: float):
+    # continuous mode: poll cmds forever, append every exchange to a capture log
+    n = 0
+    with CaptureWriter(path) as log:
+        try:
+            while True:
+                cycle = time.time()
+                for name in cmds:
+                    os.write(fd, build_cmd(name))
+                    t0 = time.time()
+                    try:
+                        resp = read_until_cr(fd, timeout=3.0)
+                    except Exception as e:
+                        print(f"{name}: read failed: {e}", file=sys.stderr)
+                        continue
+                    log.write(name, resp, t0, time.time())
+                    n += 1
+                    time.sleep(0.1)
+
+                time.sleep(max(0.0, interval - (time.time() - cycle)))
+        except KeyboardInterrupt:
+            pass
+    print(f"Captured {n} frames → {path}")
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--device", required=True)   # e.g. /dev/hidraw0
     ap.add_argument("--out", default="samples.json")
     ap.add_argument("--cmds", default="QPIGS,QPIRI,QPIWS,QMOD")
+    ap.add_argument("--capture", help="append frames to this capture log until Ctrl-C (replay:<path> device)")
+    ap.add_argument("--interval", type=float, default=2.0, help="seconds between capture cycles")
     args = ap.parse_args()
 
     fd = os.open(args.device, os.O_RDWR | os.O_NONBLOCK)
@@ -79,8 +71,14 @@ def main():
     flags = fcntl.fcntl(fd, fcntl.F_GETFD)
     fcntl.fcntl(fd, fcntl.F_SETFD, flags | fcntl.FD_CLOEXEC)
 
+    cmds = [c.strip() for c in args.cmds.split(",") if c.strip()]
+    if args.capture:
+        capture(fd, cmds, args.capture, args.interval)
+        os.close(fd)
+        return
+
     samples = []
-    for name in [c.strip() for c in args.cmds.split(",") if c.strip()]:
+    for name in cmds:
         req = build_cmd(name)
         os.write(fd, req)
         t0 = time.time()
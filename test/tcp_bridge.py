@@ -1,5 +1,24 @@
 #!/usr/bin/env python3
-import os, fcntl, socket, select, argparse
+import os, fcntl, asyncio, argparse
+from binascii import crc_hqx
+
+FRAME_END = b"\r"
+MAX_BYTES = 4096
+
+
+def build_frame(payload: bytes) -> bytes:
+    # PI30 CRC (XMODEM), bytes that would read as '(', CR or LF bumped by one
+    crc = crc_hqx(payload, 0)
+    if (crc & 0xFF) in (0x0A, 0x0D, 0x28):
+        crc += 0x01
+    if (crc >> 8) in (0x0A, 0x0D, 0x28):
+        crc += 0x100
+    return payload + bytes(((crc >> 8) & 0xFF, crc & 0xFF)) + FRAME_END
+
+
+# sent back when the device did not answer, the client fails fast instead of timing out
+NAK_FRAME = build_frame(b"(NAK")
+
 
 def open_hid(path: str) -> int:
     fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
@@ -7,55 +26,191 @@ def open_hid(path: str) -> int:
     fcntl.fcntl(fd, fcntl.F_SETFD, flags | fcntl.FD_CLOEXEC)
     return fd
 
-def relay_once(hid_fd: int, conn: socket.socket):
-    rlist, _, _ = select.select([hid_fd, conn], [], [], 1.0)
-    if hid_fd in rlist:
+
+class HidOwner:
+    """The only task touching the HID device. Clients queue whole request frames.
+
+    Identical queries waiting at the same time share one device round-trip, and
+    a query answered less than `ttl` seconds ago is served from cache. Setters
+    (anything not starting with 'Q') always go to the device, in order.
+    """
+
+    def __init__(self, path: str, ttl: float, timeout: float):
+        self._path = path
+        self._ttl = ttl
+        self._timeout = timeout
+        self._fd = None
+
+        self._queue = asyncio.Queue()
+        self._inflight = {}
+        self._cache = {}
+
+        self._rx = bytearray()
+        self._rx_event = asyncio.Event()
+
+        self.stats = {"requests": 0, "device": 0, "coalesced": 0, "cached": 0}
+
+    async def request(self, frame: bytes) -> bytes:
+        self.stats["requests"] += 1
+        loop = asyncio.get_running_loop()
+
+        if not frame.startswith(b"Q"):
+            fut = loop.create_future()
+            await self._queue.put((frame, fut))
+            return await fut
+
+        cached = self._cache.get(frame)
+        if cached and loop.time() - cached[0] < self._ttl:
+            self.stats["cached"] += 1
+            return cached[1]
+
+        fut = self._inflight.get(frame)
+        if fut is not None:
+            self.stats["coalesced"] += 1
+        else:
+            fut = self._inflight[frame] = loop.create_future()
+            await self._queue.put((frame, fut))
+
+        # shielded, one client going away must not cancel the others' answer
+        return await asyncio.shield(fut)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            frame, fut = await self._queue.get()
+            try:
+                resp = await self._exchange(frame)
+            except Exception as e:
+                if not fut.done():
+                    fut.set_exception(e)
+                    fut.exception()  # retrieved, nobody may be waiting anymore
+            else:
+                if not fut.done():
+                    fut.set_result(resp)
+                if frame.startswith(b"Q"):
+                    self._cache[frame] = (loop.time(), resp)
+            finally:
+                if self._inflight.get(frame) is fut:
+                    del self._inflight[frame]
+
+    def _ensure_open(self):
+        if self._fd is None:
+            self._fd = open_hid(self._path)
+            asyncio.get_running_loop().add_reader(self._fd, self._on_readable)
+        return self._fd
+
+    def _close(self):
+        if self._fd is not None:
+            asyncio.get_running_loop().remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+
+    def _on_readable(self):
         try:
-            data = os.read(hid_fd, 4096)
-            if data:
-                conn.sendall(data)
+            data = os.read(self._fd, MAX_BYTES)
         except BlockingIOError:
-            pass
-    if conn in rlist:
-        data = conn.recv(4096)
-        if data:
-            os.write(hid_fd, data)
-        else:
-            raise ConnectionError("client closed")
-
-def serve(dev: str, host: str, port: int):
-    hid_fd = open_hid(dev)
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        s.bind((host, port))
-        s.listen(1)
-        print(f"Bridge ready on {host}:{port} -> {dev}")
+            return
+        except OSError:
+            self._close()
+            self._rx_event.set()
+            return
+        self._rx += data
+        self._rx_event.set()
+
+    async def _exchange(self, frame: bytes) -> bytes:
+        loop = asyncio.get_running_loop()
+        try:
+            fd = self._ensure_open()
+            self._rx.clear()  # anything left over belongs to an earlier request
+            os.write(fd, frame)
+        except OSError:
+            self._close()
+            raise
+
+        self.stats["device"] += 1
+        deadline = loop.time() + self._timeout
+        while True:
+            i = self._rx.find(FRAME_END)
+            if i >= 0:
+                resp = bytes(self._rx[:i + 1])
+                del self._rx[:i + 1]
+                # drop HID zero padding left from the previous report
+                start = resp.find(b"(")
+                return resp[start:] if start > 0 else resp
+
+            if self._fd is None:
+                raise ConnectionError(f"{self._path} went away")
+
+            remain = deadline - loop.time()
+            if remain <= 0 or len(self._rx) > MAX_BYTES:
+                raise TimeoutError(f"no answer to {frame!r}")
+
+            self._rx_event.clear()
+            try:
+                await asyncio.wait_for(self._rx_event.wait(), remain)
+            except asyncio.TimeoutError:
+                pass
+
+
+async def handle_client(owner: HidOwner, reader, writer):
+    addr = writer.get_extra_info("peername")
+    print(f"Client {addr} connected")
+    try:
         while True:
-            conn, addr = s.accept()
-            print(f"Client {addr} connected")
-            with conn:
-                try:
-                    while True:
-                        relay_once(hid_fd, conn)
-                except Exception as e:
-                    print(f"Client {addr} disconnected: {e}")
+            frame = await reader.readuntil(FRAME_END)
+            try:
+                resp = await owner.request(frame)
+            except Exception as e:
+                print(f"Client {addr}: {frame!r} failed: {e}")
+                resp = NAK_FRAME
+            writer.write(resp)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError) as e:
+        print(f"Client {addr} disconnected: {e!r}")
+    finally:
+        writer.close()
+
+
+async def serve(dev: str, host: str, port: int, ttl: float, timeout: float):
+    owner = HidOwner(dev, ttl, timeout)
+    worker = asyncio.create_task(owner.run())
+
+    server = await asyncio.start_server(
+        lambda r, w: handle_client(owner, r, w), host, port, limit=MAX_BYTES
+    )
+    print(f"Bridge ready on {host}:{port} -> {dev}")
+    async with server:
+        try:
+            await server.serve_forever()
+        finally:
+            worker.cancel()
+            print(f"Stats: {owner.stats}")
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("--dev", default="/dev/hidraw0")
     ap.add_argument("--host", default="0.0.0.0")   # bind locally; tunnel from dev box
     ap.add_argument("--port", type=int, default=9009)
+    ap.add_argument("--ttl", type=float, default=0.5, help="seconds a query answer is reused for other clients")
+    ap.add_argument("--timeout", type=float, default=3.0, help="seconds to wait for the device")
     args = ap.parse_args()
-    serve(args.dev, args.host, args.port)
+    try:
+        asyncio.run(serve(args.dev, args.host, args.port, args.ttl, args.timeout))
+    except KeyboardInterrupt:
+        pass
 
 # How To
 # 1. In the terminal on the HA instance, run the tcp_bridge:
 # > tcp_bridge.py --dev /dev/hidraw0 --host 0.0.0.0 --port 9009
-# 
-# In your devcontainer, create pipe:
+#
+# In your config, point straight at the bridge:
+# solar_inverter:
+#   device: tcp://192.168.0.250:9009
+#
+# Or, the old way, in your devcontainer create pipe:
 # > test/pipe.bash
-# Or pty_bridge: 
+# Or pty_bridge:
 #
 # In your config, point to a pipe device:
 # solar_inverter:
-#   device: /tmp/inverter
\ No newline at end of file
+#   device: /tmp/inverter